@@ -5,7 +5,7 @@ import os
 import yaml
 from dotenv import load_dotenv
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.constants import AssetPaths
 
 # Load environment variables
@@ -160,6 +160,13 @@ class Config:
         coords = self._config_data.get('coordinates', {})
         return (coords.get('login_button_x', 1200), coords.get('login_button_y', 1000))
     
+    def get_search_region(self, name: str) -> Optional[tuple]:
+        """Get the configured (x, y, width, height) template search region for an element"""
+        region = (self._config_data.get('search_regions') or {}).get(name)
+        if not region:
+            return None
+        return tuple(int(v) for v in region)
+    
     def validate_config(self):
         """Validate that required configuration is present"""
         # Check credentials
@@ -3,799 +3,808 @@ Generic housing navigation automation module
 Handles navigation to housing/castles after game verification
 """
 import time
+import random
+import functools
+from typing import Optional
+import cv2
 import pyautogui
 from src.core.automation_base import AutomationBase
 from src.core.action_result import ActionResult
-from src.core.element import ElementSearchCriteria, ElementType, DetectionMethod
+from src.core.element import ElementSearchCriteria, ElementType, DetectionMethod, BoundingBox
 from src.utils.logger import logger
+from src.utils.poll_schedule import PollSchedule
+from src.utils import win_input
 from src.constants import AssetPaths
 from config import config
 
+# Template paths are static for the process lifetime, so resolve them once at import
+_SPELLBOOK_PATH = config.get_game_template_path(AssetPaths.GameTemplates.SPELLBOOK)
+_HOUSING_NAV_PATH = config.get_game_template_path(AssetPaths.GameTemplates.HOUSING_NAV)
+_CASTLES_PATH = config.get_game_template_path(AssetPaths.GameTemplates.CASTLES)
+_EQUIP_PATH = config.get_game_template_path(AssetPaths.GameTemplates.EQUIP)
+_UNEQUIP_PATH = config.get_game_template_path(AssetPaths.GameTemplates.UNEQUIP)
+_GO_HOME_PATH = config.get_game_template_path(AssetPaths.GameTemplates.GO_HOME)
+_PLACE_OBJECT_PATH = config.get_game_template_path(AssetPaths.GameTemplates.PLACE_OBJECT)
+_HOUSE_START_PATH = config.get_game_template_path(AssetPaths.GameTemplates.HOUSE_START)
+_OUTSIDE_BUTTON_PATH = config.get_game_template_path(AssetPaths.GameTemplates.OUTSIDE_BUTTON)
+_HOUSE_TEMPLATE_PATHS = {
+    "red_barn_farm": config.get_game_template_path(AssetPaths.GameTemplates.RED_BARN_FARM),
+    "wysteria_villa": config.get_game_template_path(AssetPaths.GameTemplates.WYSTERIA_VILLA)
+}
+
+# Errors a housing step can expect from input/detection; anything else propagates
+# up to the catch in execute()
+_STEP_ERRORS = (pyautogui.FailSafeException, OSError, cv2.error)
+
+def _guarded(failure_message: str):
+    """Convert expected step errors into a failure result (message may reference {self})"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            except _STEP_ERRORS as e:
+                message = failure_message.format(self=self)
+                logger.error(f"{message}: {e}")
+                return ActionResult.failure_result(message, error=e)
+        return wrapper
+    return decorator
+
+def _search_region(name: str) -> Optional[BoundingBox]:
+    """Look up the configured search region for a housing element, if any"""
+    region = config.get_search_region(name)
+    return BoundingBox(*region) if region else None
+
+def _button_criteria(name: str, template_path: str, description: str,
+                     detection_methods: Optional[list] = None) -> ElementSearchCriteria:
+    """Build the standard search criteria used for housing buttons"""
+    return ElementSearchCriteria(
+        name=name,
+        element_type=ElementType.BUTTON,
+        template_path=template_path,
+        confidence_threshold=0.8,
+        detection_methods=detection_methods or [DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
+        region=_search_region(name),
+        metadata={"description": description}
+    )
+
+def _house_text_criteria(name: str, template_path: str, confidence: float, description: str) -> ElementSearchCriteria:
+    """Build the search criteria used for a house entry in the castles list"""
+    # House names are plain text, so luminance carries the match; a half-size
+    # pass rejects frames without the name before the full-size search runs
+    return ElementSearchCriteria(
+        name=name,
+        element_type=ElementType.TEXT,
+        template_path=template_path,
+        confidence_threshold=confidence,
+        detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
+        metadata={"description": description},
+        grayscale=True,
+        scale_steps=[1.0, 0.5]
+    )
+
 class HousingNavigationAutomation(AutomationBase):
     """Handles generic navigation to housing/castles in Wizard101"""
     
-    def __init__(self, ui_detector, house_type="red_barn_farm"):
+    # Search criteria never change between calls, so build them once at import
+    HOUSING_NAV_CRITERIA = _button_criteria("housing_nav", _HOUSING_NAV_PATH, "Housing navigation button")
+    CASTLES_CRITERIA = _button_criteria("castles", _CASTLES_PATH, "Castles button")
+    UNEQUIP_CRITERIA = _button_criteria("unequip", _UNEQUIP_PATH, "Unequip button indicating red barn farm is equipped")
+    EQUIP_CRITERIA = _button_criteria("equip", _EQUIP_PATH, "Equip button to equip red barn farm")
+    GO_HOME_CRITERIA = _button_criteria("go_home", _GO_HOME_PATH, "Go home button to return to the game world")
+    # The spellbook is only ever presence-polled. Visual button detection reports
+    # a fixed 0.7 confidence that can never clear the 0.8 threshold, so running
+    # it (Canny + contours over the full frame) after every template miss in the
+    # loading-screen polls was pure overhead
+    SPELLBOOK_CRITERIA = _button_criteria("spellbook", _SPELLBOOK_PATH, "Spellbook button that disappears during loading screens",
+                                          detection_methods=[DetectionMethod.TEMPLATE])
+    PLACE_OBJECT_CRITERIA = _button_criteria("place_object", _PLACE_OBJECT_PATH, "Place object button indicating player is in house")
+    HOUSE_START_CRITERIA = _button_criteria("house_start", _HOUSE_START_PATH, "House start button")
+    OUTSIDE_BUTTON_CRITERIA = _button_criteria("outside_button", _OUTSIDE_BUTTON_PATH, "Outside button")
+    
+    H_PRESS_FAILURE_LIMIT = 2
+    H_BACKOFF_MAX = 32.0
+    
+    # Per-attempt budget (seconds) for the house_start click -> outside_button
+    # flow; about the 1s find plus 1s check each attempt used to take
+    HOUSE_START_FLOW_TIMEOUT = 2.0
+    
+    def __init__(self, ui_detector, house_type="red_barn_farm", max_retries: int = 3,
+                 retry_base_delay: float = 1.0, retry_max_delay: float = 5.0):
         super().__init__(ui_detector)
         self.house_type = house_type
+        
+        # house_start click retries back off exponentially from retry_base_delay
+        # up to retry_max_delay instead of always sleeping 5 seconds
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        
+        # House criteria depend only on house_type, so build them once per instance.
+        # The lower thresholds handle background color variations (selected vs unselected state)
+        self._house_criteria = None
+        self._house_fallback_criteria = None
+        template_path = self._get_house_template_path()
+        if template_path:
+            self._house_criteria = _house_text_criteria(
+                house_type, template_path, 0.6, f"{house_type} text to click on"
+            )
+            self._house_fallback_criteria = _house_text_criteria(
+                f"{house_type}_fallback", template_path, 0.4, f"{house_type} text fallback detection"
+            )
+        
+        # Every template this flow matches is fixed, so decode them all up front
+        self.ui_detector.preload_templates([
+            criteria for criteria in (
+                self.SPELLBOOK_CRITERIA, self.HOUSING_NAV_CRITERIA, self.CASTLES_CRITERIA,
+                self.EQUIP_CRITERIA, self.UNEQUIP_CRITERIA, self.GO_HOME_CRITERIA,
+                self.PLACE_OBJECT_CRITERIA, self.HOUSE_START_CRITERIA, self.OUTSIDE_BUTTON_CRITERIA,
+                self._house_criteria, self._house_fallback_criteria
+            ) if criteria is not None
+        ])
+        
+        # (timestamp, already_in_house) from the last check; reused for a short
+        # window so back-to-back runs skip the place_object template match
+        self._in_house_cache = (0.0, None)
+        
+        # 'h' toggles the menu, so pressing it again while the menu is merely slow
+        # closes it. After H_PRESS_FAILURE_LIMIT fruitless presses in a row, presses
+        # are held off for a doubling window (capped at H_BACKOFF_MAX) and the screen
+        # is only watched; a successful toggle resets the window
+        self._h_failed_presses = 0
+        self._h_backoff_count = 0
+        self._h_backoff_until = 0.0
+        
+        # Step tables for the two linear flows, bound once
+        self._housing_menu_steps = (
+            self.press_b_key,  # Open housing menu
+            self.wait_and_click_housing_nav,
+            self.wait_and_click_castles,
+            self.wait_and_click_house,
+            self.handle_equip_unequip,  # Make sure the house is equipped
+            self.click_go_home,
+        )
+        self._house_flow_steps = (
+            self.toggle_housing_menu_and_find_house_start,
+            self.wait_and_click_outside_button,
+            self.close_housing_menu,
+        )
     
     def execute(self) -> ActionResult:
         """Execute housing navigation automation workflow"""
-        try:
-            logger.info("Starting housing navigation automation")
-            
-            # Check if player is already in the house
-            result = self.check_if_already_in_house()
-            if not result.success:
-                return result
-            
-            # If we're already in house, handle the house navigation flow
-            if result.data and result.data.get('already_in_house', False):
-                logger.info("Player is already in house, executing house navigation flow")
-                return self.execute_house_navigation_flow()
-            
-            # Press 'b' key to open housing menu
-            result = self.press_b_key()
-            if not result.success:
-                return result
-            
-            # Wait for housing navigation to appear and click it
-            result = self.wait_and_click_housing_nav()
-            if not result.success:
-                return result
-            
-            # Wait for castles to appear and click it
-            result = self.wait_and_click_castles()
-            if not result.success:
-                return result
-            
-            # Wait for the specified house to appear and click it
-            result = self.wait_and_click_house()
-            if not result.success:
-                return result
-            
-            # Handle equip/unequip logic for red barn farm
-            result = self.handle_equip_unequip()
-            if not result.success:
-                return result
-            
-            # Click go home button after confirming red barn farm is equipped
-            result = self.click_go_home()
-            if not result.success:
-                return result
-            
-            logger.info("Housing navigation automation completed successfully")
-            return ActionResult.success_result("Housing navigation automation completed successfully")
-            
-        except Exception as e:
-            return ActionResult.failure_result("Housing navigation automation failed", error=e)
+        return self._execute_workflow("Housing navigation", self._in_house_navigation)
     
     def execute_house_selection_only(self) -> ActionResult:
         """Execute only house selection without navigating to front of house (for farming bot)"""
+        # If we're already in house, just return success (no need to navigate to front)
+        return self._execute_workflow("House selection", self._in_house_selection_only)
+    
+    def _execute_workflow(self, workflow_name: str, in_house_action) -> ActionResult:
+        """Check the house state, then either run in_house_action or the housing menu steps"""
         try:
-            logger.info("Starting house selection only automation")
+            logger.info(f"Starting {workflow_name.lower()} automation")
             
             # Check if player is already in the house
             result = self.check_if_already_in_house()
             if not result.success:
                 return result
             
-            # If we're already in house, just return success (no need to navigate to front)
             if result.data and result.data.get('already_in_house', False):
-                logger.info("Player is already in house, no additional navigation needed")
-                return ActionResult.success_result("Player is already in house")
-            
-            # Press 'b' key to open housing menu
-            result = self.press_b_key()
-            if not result.success:
-                return result
-            
-            # Wait for housing navigation to appear and click it
-            result = self.wait_and_click_housing_nav()
-            if not result.success:
-                return result
-            
-            # Wait for castles to appear and click it
-            result = self.wait_and_click_castles()
-            if not result.success:
+                result = in_house_action()
+                if result.success:
+                    self._in_house_cache = (time.time(), True)
                 return result
             
-            # Wait for the specified house to appear and click it
-            result = self.wait_and_click_house()
+            # Open the housing menu, pick the house, equip it and go home
+            result = self._run_steps(self._housing_menu_steps)
             if not result.success:
                 return result
             
-            # Handle equip/unequip logic for red barn farm
-            result = self.handle_equip_unequip()
-            if not result.success:
-                return result
+            self._in_house_cache = (time.time(), True)
+            logger.info(f"{workflow_name} automation completed successfully")
+            return ActionResult.success_result(f"{workflow_name} automation completed successfully")
             
-            # Click go home button after confirming red barn farm is equipped
-            result = self.click_go_home()
+        except Exception as e:
+            return ActionResult.failure_result(f"{workflow_name} automation failed", error=e)
+    
+    def _in_house_navigation(self) -> ActionResult:
+        """Already in the house: walk out to the front of it"""
+        logger.info("Player is already in house, executing house navigation flow")
+        return self.execute_house_navigation_flow()
+    
+    def _in_house_selection_only(self) -> ActionResult:
+        """Already in the house: nothing left to select"""
+        logger.info("Player is already in house, no additional navigation needed")
+        return ActionResult.success_result("Player is already in house")
+    
+    def _run_steps(self, steps) -> ActionResult:
+        """Run step methods in order, stopping at the first failure"""
+        result = ActionResult.success_result("No steps to run")
+        for step in steps:
+            result = step()
             if not result.success:
                 return result
-            
-            logger.info("House selection automation completed successfully")
-            return ActionResult.success_result("House selection automation completed successfully")
-            
-        except Exception as e:
-            return ActionResult.failure_result("House selection automation failed", error=e)
+        return result
     
+    @_guarded("Failed to press 'b' key")
     def press_b_key(self) -> ActionResult:
         """Press the 'b' key to open housing menu"""
-        try:
-            logger.info("Pressing 'b' key to open housing menu...")
-            
-            # Press 'b' key
-            pyautogui.press('b')
-            
-            # Wait a moment for the action to register
-            time.sleep(0.3)
-            
-            logger.info("'b' key pressed successfully")
-            return ActionResult.success_result("'b' key pressed successfully")
-            
-        except Exception as e:
-            return ActionResult.failure_result("Failed to press 'b' key", error=e)
+        logger.info("Pressing 'b' key to open housing menu...")
+        
+        # Press 'b' key
+        win_input.press_key(win_input.VK_B)
+        self.ui_detector.invalidate_screenshot()
+        
+        # Return as soon as the menu shows instead of sleeping a fixed 0.3s; the
+        # next step waits for housing_nav properly if it is slower than this
+        self._await_ui_change(lambda: self.ui_detector.is_element_present(self.HOUSING_NAV_CRITERIA))
+        
+        logger.info("'b' key pressed successfully")
+        return ActionResult.success_result("'b' key pressed successfully")
     
+    @_guarded("Failed to wait for and click housing navigation")
     def wait_and_click_housing_nav(self, timeout: float = 30.0) -> ActionResult:
         """Wait for housing navigation to appear and click it"""
-        try:
-            logger.info("Waiting for housing navigation to appear...")
-            
-            # Define search criteria for housing navigation
-            housing_nav_criteria = ElementSearchCriteria(
-                name="housing_nav",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.HOUSING_NAV),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Housing navigation button"}
-            )
-            
-            # Wait for the housing navigation to appear
-            result = self.wait_for_element(housing_nav_criteria, timeout=timeout, check_interval=2.0)
-            
-            if not result.success:
-                logger.warning("Housing navigation not found within timeout")
-                return ActionResult.failure_result("Housing navigation not found within timeout")
-            
-            logger.info("Housing navigation detected successfully")
-            
-            # Click the housing navigation button
-            click_result = self.find_and_click(housing_nav_criteria, wait_time=1.0, retries=3)
-            
-            if click_result.success:
-                logger.info("Housing navigation clicked successfully")
-                return ActionResult.success_result("Housing navigation clicked successfully")
-            else:
-                logger.error("Failed to click housing navigation")
-                return ActionResult.failure_result("Failed to click housing navigation")
-                
-        except Exception as e:
-            return ActionResult.failure_result("Failed to wait for and click housing navigation", error=e)
+        logger.info("Waiting for housing navigation to appear...")
+        
+        housing_nav_criteria = self.HOUSING_NAV_CRITERIA
+        
+        # Wait for the housing navigation to appear
+        result = self.wait_for_element(housing_nav_criteria, timeout=timeout, check_interval=2.0,
+                                       schedule=PollSchedule.for_element("housing_nav"))
+        
+        if not result.success:
+            logger.warning("Housing navigation not found within timeout")
+            return ActionResult.failure_result("Housing navigation not found within timeout")
+        
+        logger.info("Housing navigation detected successfully")
+        
+        # Click the housing navigation button
+        click_result = self.click_waited_element(result, housing_nav_criteria)
+        
+        if click_result.success:
+            logger.info("Housing navigation clicked successfully")
+            return ActionResult.success_result("Housing navigation clicked successfully")
+        else:
+            logger.error("Failed to click housing navigation")
+            return ActionResult.failure_result("Failed to click housing navigation")
     
+    @_guarded("Failed to wait for and click castles")
     def wait_and_click_castles(self, timeout: float = 30.0) -> ActionResult:
         """Wait for castles to appear and click it"""
-        try:
-            logger.info("Waiting for castles to appear...")
-            
-            # Define search criteria for castles
-            castles_criteria = ElementSearchCriteria(
-                name="castles",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.CASTLES),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Castles button"}
-            )
-            
-            # Wait for the castles to appear
-            result = self.wait_for_element(castles_criteria, timeout=timeout, check_interval=2.0)
-            
-            if not result.success:
-                logger.warning("Castles not found within timeout")
-                return ActionResult.failure_result("Castles not found within timeout")
-            
-            logger.info("Castles detected successfully")
-            
-            # Click the castles button
-            click_result = self.find_and_click(castles_criteria, wait_time=1.0, retries=3)
-            
-            if click_result.success:
-                logger.info("Castles clicked successfully")
-                return ActionResult.success_result("Castles clicked successfully")
-            else:
-                logger.error("Failed to click castles")
-                return ActionResult.failure_result("Failed to click castles")
-                
-        except Exception as e:
-            return ActionResult.failure_result("Failed to wait for and click castles", error=e)
+        logger.info("Waiting for castles to appear...")
+        
+        castles_criteria = self.CASTLES_CRITERIA
+        
+        # Wait for the castles to appear
+        result = self.wait_for_element(castles_criteria, timeout=timeout, check_interval=2.0,
+                                       schedule=PollSchedule.for_element("castles"))
+        
+        if not result.success:
+            logger.warning("Castles not found within timeout")
+            return ActionResult.failure_result("Castles not found within timeout")
+        
+        logger.info("Castles detected successfully")
+        
+        # Click the castles button
+        click_result = self.click_waited_element(result, castles_criteria)
+        
+        if click_result.success:
+            logger.info("Castles clicked successfully")
+            return ActionResult.success_result("Castles clicked successfully")
+        else:
+            logger.error("Failed to click castles")
+            return ActionResult.failure_result("Failed to click castles")
     
+    @_guarded("Failed to wait for and click {self.house_type}")
     def wait_and_click_house(self, timeout: float = 30.0) -> ActionResult:
         """Wait for the specified house text to appear and click it"""
-        try:
-            logger.info(f"Waiting for {self.house_type} text to appear...")
-            
-            # Get the appropriate template path based on house type
-            template_path = self._get_house_template_path()
-            if not template_path:
-                return ActionResult.failure_result(f"Unknown house type: {self.house_type}")
-            
-            # Define search criteria for the house with lower confidence threshold
-            # to handle background color variations (selected vs unselected state)
-            house_criteria = ElementSearchCriteria(
-                name=self.house_type,
-                element_type=ElementType.TEXT,
-                template_path=template_path,
-                confidence_threshold=0.6,  # Reduced from 0.8 to handle background color variations
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": f"{self.house_type} text to click on"}
-            )
-            
-            # Wait for the house text to appear
-            result = self.wait_for_element(house_criteria, timeout=timeout, check_interval=2.0)
-            
-            if not result.success:
-                logger.warning(f"{self.house_type} text not found within timeout")
-                # Try with even lower confidence threshold as fallback
-                logger.info(f"Trying fallback detection with lower confidence threshold...")
-                fallback_criteria = ElementSearchCriteria(
-                    name=f"{self.house_type}_fallback",
-                    element_type=ElementType.TEXT,
-                    template_path=template_path,
-                    confidence_threshold=0.4,  # Even lower threshold for fallback
-                    detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                    metadata={"description": f"{self.house_type} text fallback detection"}
-                )
-                
-                fallback_result = self.wait_for_element(fallback_criteria, timeout=10.0, check_interval=1.0)
-                if fallback_result.success:
-                    logger.info(f"{self.house_type} detected with fallback confidence threshold")
-                    # Update the criteria to use the fallback result
-                    house_criteria = fallback_criteria
-                else:
-                    return ActionResult.failure_result(f"{self.house_type} text not found even with fallback detection")
-            
-            logger.info(f"{self.house_type} text detected successfully")
-            
-            # Click the house text
-            click_result = self.find_and_click(house_criteria, wait_time=1.0, retries=3)
-            
-            if click_result.success:
-                logger.info(f"{self.house_type} clicked successfully")
-                return ActionResult.success_result(f"{self.house_type} clicked successfully")
+        logger.info(f"Waiting for {self.house_type} text to appear...")
+        
+        house_criteria = self._house_criteria
+        if house_criteria is None:
+            return ActionResult.failure_result(f"Unknown house type: {self.house_type}")
+        
+        # Wait for the house text to appear
+        result = self.wait_for_element(house_criteria, timeout=timeout, check_interval=2.0,
+                                       schedule=PollSchedule.for_element(house_criteria.name))
+        
+        if not result.success:
+            logger.warning(f"{self.house_type} text not found within timeout")
+            # Try with even lower confidence threshold as fallback
+            logger.info(f"Trying fallback detection with lower confidence threshold...")
+            fallback_criteria = self._house_fallback_criteria
+            
+            fallback_result = self.wait_for_element(fallback_criteria, timeout=10.0, check_interval=1.0)
+            if fallback_result.success:
+                logger.info(f"{self.house_type} detected with fallback confidence threshold")
+                # Update the criteria to use the fallback result
+                house_criteria = fallback_criteria
+                result = fallback_result
             else:
-                logger.error(f"Failed to click {self.house_type}")
-                return ActionResult.failure_result(f"Failed to click {self.house_type}")
-                
-        except Exception as e:
-            logger.error(f"Failed to wait for and click {self.house_type}: {e}")
-            return ActionResult.failure_result(f"Failed to wait for and click {self.house_type}", error=e)
+                return ActionResult.failure_result(f"{self.house_type} text not found even with fallback detection")
+        
+        logger.info(f"{self.house_type} text detected successfully")
+        
+        # Click the house text
+        click_result = self.click_waited_element(result, house_criteria)
+        
+        if click_result.success:
+            logger.info(f"{self.house_type} clicked successfully")
+            return ActionResult.success_result(f"{self.house_type} clicked successfully")
+        else:
+            logger.error(f"Failed to click {self.house_type}")
+            return ActionResult.failure_result(f"Failed to click {self.house_type}")
     
     def _get_house_template_path(self) -> str:
         """Get the template path for the specified house type"""
-        house_templates = {
-            "red_barn_farm": AssetPaths.GameTemplates.RED_BARN_FARM,
-            "wysteria_villa": AssetPaths.GameTemplates.WYSTERIA_VILLA
-        }
-        
-        if self.house_type in house_templates:
-            return config.get_game_template_path(house_templates[self.house_type])
-        
-        return None
+        return _HOUSE_TEMPLATE_PATHS.get(self.house_type)
     
+    @_guarded("Failed to test house detection")
     def test_house_detection(self, confidence_levels: list = [0.8, 0.6, 0.4, 0.2]) -> ActionResult:
         """Test house detection with different confidence levels for debugging"""
-        try:
-            logger.info(f"Testing {self.house_type} detection with different confidence levels...")
-            
-            template_path = self._get_house_template_path()
-            if not template_path:
-                return ActionResult.failure_result(f"Unknown house type: {self.house_type}")
-            
-            for confidence in confidence_levels:
-                logger.info(f"Testing with confidence threshold: {confidence}")
-                
-                test_criteria = ElementSearchCriteria(
-                    name=f"{self.house_type}_test_{confidence}",
-                    element_type=ElementType.TEXT,
-                    template_path=template_path,
-                    confidence_threshold=confidence,
-                    detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                    metadata={"description": f"{self.house_type} test detection at {confidence}"}
-                )
-                
-                # Quick check without waiting
-                if self.ui_detector.is_element_present(test_criteria):
-                    logger.info(f"✓ {self.house_type} detected with confidence {confidence}")
-                    return ActionResult.success_result(f"House detected with confidence {confidence}", data={'confidence': confidence})
-                else:
-                    logger.info(f"✗ {self.house_type} not detected with confidence {confidence}")
-            
-            return ActionResult.failure_result(f"{self.house_type} not detected with any confidence level")
-            
-        except Exception as e:
-            logger.error(f"Failed to test house detection: {e}")
-            return ActionResult.failure_result("Failed to test house detection", error=e)
+        logger.info(f"Testing {self.house_type} detection with different confidence levels...")
+        
+        template_path = self._get_house_template_path()
+        if not template_path:
+            return ActionResult.failure_result(f"Unknown house type: {self.house_type}")
+        
+        # The match score does not depend on the threshold, so match once and
+        # compare the single score against every confidence level
+        test_criteria = _house_text_criteria(
+            f"{self.house_type}_test", template_path, min(confidence_levels),
+            f"{self.house_type} test detection"
+        )
+        score = self.ui_detector.get_best_score(test_criteria)
+        logger.info(f"Best {self.house_type} match score: {score:.3f}")
+        
+        # Per-level results are debug detail; only the outcome is logged at INFO
+        for confidence in confidence_levels:
+            if score >= confidence:
+                logger.info(f"✓ {self.house_type} detected with confidence {confidence}")
+                return ActionResult.success_result(f"House detected with confidence {confidence}", data={'confidence': confidence})
+            logger.debug("✗ %s not detected with confidence %s", self.house_type, confidence)
+        
+        return ActionResult.failure_result(f"{self.house_type} not detected with any confidence level")
     
+    @_guarded("Failed to handle equip/unequip logic")
     def handle_equip_unequip(self, timeout: float = 10.0) -> ActionResult:
         """Handle equip/unequip logic for red barn farm"""
-        try:
-            logger.info("Checking for equip/unequip status...")
-            
-            # First check for unequip button (indicates already equipped)
-            unequip_criteria = ElementSearchCriteria(
-                name="unequip",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.UNEQUIP),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Unequip button indicating red barn farm is equipped"}
-            )
-            
-            # Check if unequip button is present
-            if self.ui_detector.is_element_present(unequip_criteria):
+        logger.info("Checking for equip/unequip status...")
+        
+        unequip_criteria = self.UNEQUIP_CRITERIA
+        equip_criteria = self.EQUIP_CRITERIA
+        
+        # Probe both buttons against a single screenshot per poll; unequip takes
+        # priority since it indicates the house is already equipped. Polling both
+        # also catches the panel settling on unequip after the first look.
+        deadline = time.monotonic() + timeout
+        while True:
+            element = self.ui_detector.classify_one_of([unequip_criteria, equip_criteria])
+            
+            if element and element.name == unequip_criteria.name:
                 logger.info("Red barn farm is already equipped (unequip button found)")
                 return ActionResult.success_result("Red barn farm is already equipped")
             
-            # If no unequip button, look for equip button
-            logger.info("Red barn farm not equipped, looking for equip button...")
-            
-            equip_criteria = ElementSearchCriteria(
-                name="equip",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.EQUIP),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Equip button to equip red barn farm"}
-            )
-            
-            # Wait for equip button to appear
-            result = self.wait_for_element(equip_criteria, timeout=timeout, check_interval=1.0)
-            
-            if not result.success:
-                logger.warning("Equip button not found within timeout")
-                return ActionResult.failure_result("Equip button not found - cannot equip red barn farm")
-            
-            logger.info("Equip button detected successfully")
-            
-            # Click the equip button
-            click_result = self.find_and_click(equip_criteria, wait_time=1.0, retries=3)
-            
-            if click_result.success:
-                logger.info("Equip button clicked successfully - red barn farm equipped")
-                return ActionResult.success_result("Red barn farm equipped successfully")
-            else:
+            if element and element.name == equip_criteria.name:
+                logger.info("Equip button detected successfully")
+                time.sleep(0.5)  # Let the panel settle before clicking
+                click_result = self.click_element(element)
+                if not click_result.success:
+                    click_result = self.find_and_click(equip_criteria, wait_time=0.0, retries=1)
+                if click_result.success:
+                    logger.info("Equip button clicked successfully - red barn farm equipped")
+                    return ActionResult.success_result("Red barn farm equipped successfully")
                 logger.error("Failed to click equip button")
                 return ActionResult.failure_result("Failed to click equip button")
-                
-        except Exception as e:
-            logger.error(f"Failed to handle equip/unequip logic: {e}")
-            return ActionResult.failure_result("Failed to handle equip/unequip logic", error=e)
+            
+            if time.monotonic() >= deadline:
+                break
+            logger.debug("Neither equip nor unequip visible yet, polling again...")
+            time.sleep(1.0)
+        
+        logger.warning("Equip button not found within timeout")
+        return ActionResult.failure_result("Equip button not found - cannot equip red barn farm")
     
+    @_guarded("Failed to click go home button")
     def click_go_home(self, timeout: float = 10.0) -> ActionResult:
         """Click the go home button after confirming red barn farm is equipped"""
-        try:
-            logger.info("Looking for go home button...")
-            
-            # Define search criteria for go home button
-            go_home_criteria = ElementSearchCriteria(
-                name="go_home",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.GO_HOME),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Go home button to return to the game world"}
-            )
-            
-            # Wait for go home button to appear
-            result = self.wait_for_element(go_home_criteria, timeout=timeout, check_interval=1.0)
-            
-            if not result.success:
-                logger.warning("Go home button not found within timeout")
-                return ActionResult.failure_result("Go home button not found - cannot return to game world")
-            
-            logger.info("Go home button detected successfully")
-            
-            # Click the go home button
-            click_result = self.find_and_click(go_home_criteria, wait_time=1.0, retries=3)
-            
-            if not click_result.success:
-                logger.error("Failed to click go home button")
-                return ActionResult.failure_result("Failed to click go home button")
-            
-            logger.info("Go home button clicked successfully - waiting for navigation to complete")
-            
-            # Wait for spellbook to disappear (indicates loading screen)
-            result = self.wait_for_spellbook_disappear()
-            if not result.success:
-                return result
-            
-            # Wait for spellbook to reappear (indicates successful navigation to house)
-            result = self.wait_for_spellbook_reappear()
-            if not result.success:
-                return result
-            
-            logger.info("Successfully navigated to house - spellbook reappeared")
-            return ActionResult.success_result("Successfully returned to game world and navigated to house")
-                
-        except Exception as e:
-            logger.error(f"Failed to click go home button: {e}")
-            return ActionResult.failure_result("Failed to click go home button", error=e)
+        logger.info("Looking for go home button...")
+        
+        go_home_criteria = self.GO_HOME_CRITERIA
+        
+        # Wait for go home button to appear
+        result = self.wait_for_element(go_home_criteria, timeout=timeout, check_interval=1.0,
+                                       schedule=PollSchedule.for_element("go_home"))
+        
+        if not result.success:
+            logger.warning("Go home button not found within timeout")
+            return ActionResult.failure_result("Go home button not found - cannot return to game world")
+        
+        logger.info("Go home button detected successfully")
+        
+        # Click the go home button
+        click_result = self.click_waited_element(result, go_home_criteria)
+        
+        if not click_result.success:
+            logger.error("Failed to click go home button")
+            return ActionResult.failure_result("Failed to click go home button")
+        
+        logger.info("Go home button clicked successfully - waiting for navigation to complete")
+        
+        # Wait for spellbook to disappear (indicates loading screen)
+        result = self.wait_for_spellbook_disappear()
+        if not result.success:
+            return result
+        
+        # Wait for spellbook to reappear (indicates successful navigation to house)
+        result = self.wait_for_spellbook_reappear()
+        if not result.success:
+            return result
+        
+        self._in_house_cache = (0.0, None)
+        logger.info("Successfully navigated to house - spellbook reappeared")
+        return ActionResult.success_result("Successfully returned to game world and navigated to house")
     
+    @_guarded("Failed to wait for spellbook to disappear")
     def wait_for_spellbook_disappear(self, timeout: float = 15.0) -> ActionResult:
         """Wait for spellbook to disappear after clicking go home (indicates loading screen)"""
-        try:
-            logger.info("Waiting for spellbook to disappear (loading screen)...")
-            
-            # Define search criteria for spellbook
-            spellbook_criteria = ElementSearchCriteria(
-                name="spellbook",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.SPELLBOOK),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Spellbook button that should disappear during loading"}
-            )
-            
-            # Wait for spellbook to disappear
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                if not self.ui_detector.is_element_present(spellbook_criteria):
-                    logger.info("Spellbook disappeared - loading screen detected")
-                    return ActionResult.success_result("Spellbook disappeared - loading screen detected")
-                
-                time.sleep(0.5)  # Check every 0.5 seconds
-            
-            logger.warning("Spellbook did not disappear within timeout")
-            return ActionResult.failure_result("Spellbook did not disappear within timeout - navigation may have failed")
-            
-        except Exception as e:
-            logger.error(f"Failed to wait for spellbook to disappear: {e}")
-            return ActionResult.failure_result("Failed to wait for spellbook to disappear", error=e)
+        logger.info("Waiting for spellbook to disappear (loading screen)...")
+        
+        spellbook_criteria = self.SPELLBOOK_CRITERIA
+        
+        # Wait for spellbook to disappear
+        if self._poll_with_backoff(
+            lambda: not self.ui_detector.is_element_present(spellbook_criteria, fast_negative=True),
+            timeout
+        ):
+            logger.info("Spellbook disappeared - loading screen detected")
+            return ActionResult.success_result("Spellbook disappeared - loading screen detected")
+        
+        logger.warning("Spellbook did not disappear within timeout")
+        return ActionResult.failure_result("Spellbook did not disappear within timeout - navigation may have failed")
     
+    @_guarded("Failed to wait for spellbook to reappear")
     def wait_for_spellbook_reappear(self, timeout: float = 30.0) -> ActionResult:
-        """Wait for spellbook to reappear (indicates successful navigation to house)"""
-        try:
-            logger.info("Waiting for spellbook to reappear (navigation complete)...")
-            
-            # Define search criteria for spellbook
-            spellbook_criteria = ElementSearchCriteria(
-                name="spellbook",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.SPELLBOOK),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Spellbook button that should reappear when navigation is complete"}
-            )
-            
-            # Wait for spellbook to reappear
-            result = self.wait_for_element(spellbook_criteria, timeout=timeout, check_interval=1.0)
-            
-            if result.success:
-                logger.info("Spellbook reappeared - navigation to house completed successfully")
-                return ActionResult.success_result("Spellbook reappeared - navigation to house completed successfully")
-            else:
-                logger.warning("Spellbook did not reappear within timeout")
-                return ActionResult.failure_result("Spellbook did not reappear within timeout - navigation may have failed")
-            
-        except Exception as e:
-            logger.error(f"Failed to wait for spellbook to reappear: {e}")
-            return ActionResult.failure_result("Failed to wait for spellbook to reappear", error=e)
+        """Wait for spellbook (or place_object) to reappear (indicates successful navigation to house)"""
+        logger.info("Waiting for spellbook to reappear (navigation complete)...")
+        
+        # Either HUD element coming back means the loading screen is over; both are
+        # matched against one screenshot per tick so whichever renders first wins
+        arrival_criteria = [self.SPELLBOOK_CRITERIA, self.PLACE_OBJECT_CRITERIA]
+        arrived = []
+        
+        def house_loaded() -> bool:
+            element = self.ui_detector.classify_one_of(arrival_criteria)
+            if element:
+                arrived.append(element.name)
+            return element is not None
+        
+        if self._poll_with_backoff(house_loaded, timeout):
+            logger.debug("Navigation confirmed by '%s'", arrived[-1])
+            logger.info("Spellbook reappeared - navigation to house completed successfully")
+            return ActionResult.success_result("Spellbook reappeared - navigation to house completed successfully")
+        else:
+            logger.warning("Spellbook did not reappear within timeout")
+            return ActionResult.failure_result("Spellbook did not reappear within timeout - navigation may have failed")
+    
+    def _await_ui_change(self, condition, max_wait: float = 0.4, interval: float = 0.02) -> bool:
+        """Briefly poll for the on-screen effect of a key press, bounded by max_wait"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            if condition():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
     
-    def check_if_already_in_house(self) -> ActionResult:
+    def _poll_with_backoff(self, condition, timeout: float, initial_interval: float = 0.1,
+                           backoff: float = 1.3, max_interval: float = 0.8,
+                           slow_check: float = 0.3) -> bool:
+        """
+        Poll condition until it returns True or timeout expires.
+        
+        The interval starts short so fast transitions are caught quickly and grows
+        geometrically up to max_interval. A check that itself took longer than
+        slow_check already provided the delay, so no extra sleep follows it.
+        """
+        interval = initial_interval
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            check_start = time.monotonic()
+            if condition():
+                return True
+            
+            now = time.monotonic()
+            if now >= deadline:
+                return False
+            
+            if now - check_start <= slow_check:
+                time.sleep(min(interval, deadline - now))
+                interval = min(interval * backoff, max_interval)
+    
+    @_guarded("Failed to check if already in house")
+    def check_if_already_in_house(self, cache_ttl: float = 5.0) -> ActionResult:
         """Check if player is already in the house by looking for place_object image"""
-        try:
-            logger.info("Checking if player is already in house...")
-            
-            # Define search criteria for place_object
-            place_object_criteria = ElementSearchCriteria(
-                name="place_object",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.PLACE_OBJECT),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Place object button indicating player is in house"}
-            )
-            
-            # Check if place_object is present
-            if self.ui_detector.is_element_present(place_object_criteria):
-                logger.info("Player is already in house (place_object found)")
-                return ActionResult.success_result("Player is already in house", data={'already_in_house': True})
-            else:
-                logger.info("Player is not in house (place_object not found)")
-                return ActionResult.success_result("Player is not in house", data={'already_in_house': False})
-                
-        except Exception as e:
-            logger.error(f"Failed to check if already in house: {e}")
-            return ActionResult.failure_result("Failed to check if already in house", error=e)
+        cached_at, cached_in_house = self._in_house_cache
+        if cached_in_house is not None and time.time() - cached_at < cache_ttl:
+            logger.info(f"Using cached house state: {'in house' if cached_in_house else 'not in house'}")
+            message = "Player is already in house" if cached_in_house else "Player is not in house"
+            return ActionResult.success_result(message, data={'already_in_house': cached_in_house})
+        
+        logger.info("Checking if player is already in house...")
+        
+        place_object_criteria = self.PLACE_OBJECT_CRITERIA
+        
+        # Check if place_object is present
+        in_house = self.ui_detector.is_element_present(place_object_criteria, fast_negative=True)
+        self._in_house_cache = (time.time(), in_house)
+        
+        if in_house:
+            logger.info("Player is already in house (place_object found)")
+            return ActionResult.success_result("Player is already in house", data={'already_in_house': True})
+        else:
+            logger.info("Player is not in house (place_object not found)")
+            return ActionResult.success_result("Player is not in house", data={'already_in_house': False})
     
     def execute_house_navigation_flow(self) -> ActionResult:
         """Execute the house navigation flow when player is already in house"""
-        try:
-            logger.info("Executing house navigation flow...")
-            
-            # Press 'h' key to toggle housing menu and look for house_start button
-            result = self.toggle_housing_menu_and_find_house_start()
-            if not result.success:
-                return result
-            
-            # Wait for outside_button to appear and click it
-            result = self.wait_and_click_outside_button()
-            if not result.success:
-                return result
-            
-            # Press 'H' key to close housing menu
-            result = self.close_housing_menu()
-            if not result.success:
-                return result
-            
-            logger.info("House navigation flow completed successfully")
-            return ActionResult.success_result("House navigation flow completed successfully")
-            
-        except Exception as e:
-            logger.error(f"Failed to execute house navigation flow: {e}")
-            return ActionResult.failure_result("Failed to execute house navigation flow", error=e)
+        logger.info("Executing house navigation flow...")
+        
+        # Toggle the housing menu to house_start, click outside_button, close the menu.
+        # Each step converts its expected errors itself; anything else is caught by execute()
+        result = self._run_steps(self._house_flow_steps)
+        if not result.success:
+            return result
+        
+        logger.info("House navigation flow completed successfully")
+        return ActionResult.success_result("House navigation flow completed successfully")
+    
+    def _run_flow(self, steps: list, timeout: float = 15.0, tick: float = 0.05) -> ActionResult:
+        """
+        Drive a sequence of (criteria, action) steps as a state machine.
+        
+        The screen is grabbed once per tick and only the current step's template
+        is matched against it, so a wait+click pair costs one capture instead of
+        one per wait poll plus another for the click. Supported actions are
+        "click" (click the element, then advance) and "wait" (advance once seen).
+        A stalled flow reports the 0-based index of the step it stopped at in
+        its data as "stalled_step".
+        """
+        # Bind the per-tick lookups once; the loop body is otherwise just
+        # capture, match and sleep, which already run in native code
+        take_screenshot = self.ui_detector.take_screenshot
+        find_element = self.ui_detector.find_element
+        clock = time.monotonic
+        sleep = time.sleep
+        step_count = len(steps)
+        
+        state = 0
+        start_time = time.time()
+        deadline = clock() + timeout
+        
+        while state < step_count and clock() < deadline:
+            criteria, action = steps[state]
+            element = find_element(criteria, silent=True, screenshot=take_screenshot())
+            
+            if element:
+                if action == "click":
+                    click_result = self.click_element(element)
+                    if not click_result.success:
+                        return click_result
+                logger.debug("Flow step %d/%d '%s' (%s) complete", state + 1, step_count, criteria.name, action)
+                state += 1
+                continue
+            
+            sleep(tick)
+        
+        if state < step_count:
+            criteria, action = steps[state]
+            return ActionResult.failure_result(
+                f"Flow stalled at step {state + 1}/{step_count}: '{criteria.name}' not found within {timeout}s timeout",
+                data={"stalled_step": state}
+            )
+        
+        return ActionResult.success_result(
+            "Flow completed successfully",
+            data={"steps": len(steps), "elapsed": time.time() - start_time}
+        )
     
+    @_guarded("Failed to click place object button")
     def click_place_object(self, timeout: float = 10.0) -> ActionResult:
         """Click the place_object button"""
-        try:
-            logger.info("Clicking place_object button...")
-            
-            # Define search criteria for place_object
-            place_object_criteria = ElementSearchCriteria(
-                name="place_object",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.PLACE_OBJECT),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Place object button"}
-            )
-            
-            # Click the place_object button
-            click_result = self.find_and_click(place_object_criteria, wait_time=1.0, retries=3)
-            
-            if click_result.success:
-                logger.info("Place object button clicked successfully")
-                return ActionResult.success_result("Place object button clicked successfully")
-            else:
-                logger.error("Failed to click place object button")
-                return ActionResult.failure_result("Failed to click place object button")
-                
-        except Exception as e:
-            logger.error(f"Failed to click place object button: {e}")
-            return ActionResult.failure_result("Failed to click place object button", error=e)
+        logger.info("Clicking place_object button...")
+        
+        place_object_criteria = self.PLACE_OBJECT_CRITERIA
+        
+        # Click the place_object button
+        click_result = self.find_and_click(place_object_criteria, wait_time=1.0, retries=3)
+        
+        if click_result.success:
+            logger.info("Place object button clicked successfully")
+            return ActionResult.success_result("Place object button clicked successfully")
+        else:
+            logger.error("Failed to click place object button")
+            return ActionResult.failure_result("Failed to click place object button")
     
+    @_guarded("Failed to wait for and click house start button")
     def wait_and_click_house_start(self, timeout: float = 15.0) -> ActionResult:
         """Wait for house_start to appear and click it with retry logic"""
-        try:
-            logger.info("Waiting for house_start to appear...")
-            
-            # Define search criteria for house_start
-            house_start_criteria = ElementSearchCriteria(
-                name="house_start",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.HOUSE_START),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "House start button"}
-            )
-            
-            # Define search criteria for outside_button (to verify click success)
-            outside_button_criteria = ElementSearchCriteria(
-                name="outside_button",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.OUTSIDE_BUTTON),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Outside button"}
-            )
-            
-            # Wait for the house_start to appear initially
-            result = self.wait_for_element(house_start_criteria, timeout=timeout, check_interval=2.0)
-            
-            if not result.success:
-                logger.warning("House start button not found within timeout")
-                return ActionResult.failure_result("House start button not found within timeout")
-            
-            logger.info("House start button detected successfully")
-            
-            # Retry logic: try up to 3 times
-            max_retries = 3
-            for attempt in range(1, max_retries + 1):
-                logger.info(f"Attempt {attempt}/{max_retries}: Clicking house start button...")
-                
-                # Click the house_start button
-                click_result = self.find_and_click(house_start_criteria, wait_time=1.0, retries=1)
-                
-                if not click_result.success:
-                    logger.warning(f"Failed to click house start button on attempt {attempt}")
-                    if attempt < max_retries:
-                        logger.info("Moving mouse up 50 pixels and waiting 5 seconds before retry...")
-                        current_x, current_y = pyautogui.position()
-                        pyautogui.moveTo(current_x, current_y - 50)
-                        time.sleep(5.0)
-                        continue
-                    else:
-                        return ActionResult.failure_result("Failed to click house start button after all retries")
-                
-                # Wait 1 second and check for outside_button
-                logger.info("Waiting 1 second to check if outside button appears...")
-                time.sleep(1.0)
-                
-                if self.ui_detector.is_element_present(outside_button_criteria):
-                    logger.info(f"Success! Outside button appeared after attempt {attempt}")
-                    return ActionResult.success_result("House start button clicked successfully")
-                else:
-                    logger.warning(f"Outside button not found after attempt {attempt} - button may have been grayed out")
-                    if attempt < max_retries:
-                        logger.info("Moving mouse up 50 pixels and waiting 5 seconds before retry...")
-                        current_x, current_y = pyautogui.position()
-                        pyautogui.moveTo(current_x, current_y - 50)
-                        time.sleep(5.0)
-                    else:
-                        logger.error("Failed to get outside button to appear after all retries")
-                        return ActionResult.failure_result("Failed to navigate to house start: Outside button not found within timeout")
-                
-        except Exception as e:
-            logger.error(f"Failed to wait for and click house start button: {e}")
-            return ActionResult.failure_result("Failed to wait for and click house start button", error=e)
+        logger.info("Waiting for house_start to appear...")
+        
+        house_start_criteria = self.HOUSE_START_CRITERIA
+        
+        outside_button_criteria = self.OUTSIDE_BUTTON_CRITERIA
+        
+        # Wait for the house_start to appear initially
+        result = self.wait_for_element(house_start_criteria, timeout=timeout, check_interval=2.0,
+                                       schedule=PollSchedule.for_element("house_start"))
+        
+        if not result.success:
+            logger.warning("House start button not found within timeout")
+            return ActionResult.failure_result("House start button not found within timeout")
+        
+        # Click the house_start button with retry logic
+        return self._click_house_start_with_retry(house_start_criteria, outside_button_criteria)
     
+    @_guarded("Failed to wait for and click outside button")
     def wait_and_click_outside_button(self, timeout: float = 15.0) -> ActionResult:
         """Wait for outside_button to appear and click it"""
-        try:
-            logger.info("Waiting for outside_button to appear...")
-            
-            # Define search criteria for outside_button
-            outside_button_criteria = ElementSearchCriteria(
-                name="outside_button",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.OUTSIDE_BUTTON),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Outside button"}
-            )
-            
-            # Wait for the outside_button to appear
-            result = self.wait_for_element(outside_button_criteria, timeout=timeout, check_interval=2.0)
-            
-            if not result.success:
-                logger.warning("Outside button not found within timeout")
-                return ActionResult.failure_result("Outside button not found within timeout")
-            
-            logger.info("Outside button detected successfully")
-            
-            # Click the outside_button
-            click_result = self.find_and_click(outside_button_criteria, wait_time=1.0, retries=3)
-            
-            if click_result.success:
-                logger.info("Outside button clicked successfully")
-                return ActionResult.success_result("Outside button clicked successfully")
-            else:
-                logger.error("Failed to click outside button")
-                return ActionResult.failure_result("Failed to click outside button")
-                
-        except Exception as e:
-            logger.error(f"Failed to wait for and click outside button: {e}")
-            return ActionResult.failure_result("Failed to wait for and click outside button", error=e)
+        logger.info("Waiting for outside_button to appear...")
+        
+        outside_button_criteria = self.OUTSIDE_BUTTON_CRITERIA
+        
+        # Wait for the outside_button and click it off the same screen grab
+        result = self._run_flow([(outside_button_criteria, "click")], timeout=timeout)
+        
+        if result.success:
+            logger.info("Outside button clicked successfully")
+            return ActionResult.success_result("Outside button clicked successfully")
+        elif result.data and "stalled_step" in result.data:
+            logger.warning("Outside button not found within timeout")
+            return ActionResult.failure_result("Outside button not found within timeout")
+        else:
+            logger.error("Failed to click outside button")
+            return ActionResult.failure_result("Failed to click outside button")
     
+    @_guarded("Failed to toggle housing menu and find house start")
     def toggle_housing_menu_and_find_house_start(self) -> ActionResult:
         """Press 'h' key to toggle housing menu and find house_start button with retry logic"""
-        try:
-            logger.info("Pressing 'h' key to toggle housing menu...")
+        logger.info("Pressing 'h' key to toggle housing menu...")
+        
+        house_start_criteria = self.HOUSE_START_CRITERIA
+        
+        outside_button_criteria = self.OUTSIDE_BUTTON_CRITERIA
+        
+        # Retry loop: Press 'h' multiple times until house_start appears
+        max_attempts = 5
+        for attempt in range(1, max_attempts + 1):
+            # While backing off, only watch: another press could close a menu that is still opening
+            hold_off = self._h_backoff_until - time.monotonic()
+            if hold_off > 0:
+                logger.info(f"Holding off 'h' presses for {hold_off:.1f}s, watching for house_start...")
+                if self.wait_for_element(house_start_criteria, timeout=hold_off, check_interval=0.5).success:
+                    self._reset_h_backoff()
+                    return self._click_house_start_with_retry(house_start_criteria, outside_button_criteria)
             
-            # Define search criteria for house_start
-            house_start_criteria = ElementSearchCriteria(
-                name="house_start",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.HOUSE_START),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "House start button"}
-            )
+            win_input.press_key(win_input.VK_H)
+            self.ui_detector.invalidate_screenshot()
+            # Wait for the menu to finish animating rather than a fixed 0.3s
+            self._wait_for_visual_stability(region=self.HOUSE_START_CRITERIA.region, max_wait=0.4, interval=0.05)
             
-            # Define search criteria for outside_button (to verify click success)
-            outside_button_criteria = ElementSearchCriteria(
-                name="outside_button",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_game_template_path(AssetPaths.GameTemplates.OUTSIDE_BUTTON),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Outside button"}
-            )
+            if attempt == 1:
+                logger.info("Waiting for house_start to appear...")
+            else:
+                logger.info(f"Waiting for house_start to appear after {attempt}th 'h' press...")
             
-            # Retry loop: Press 'h' multiple times until house_start appears
-            max_attempts = 5
-            for attempt in range(1, max_attempts + 1):
-                pyautogui.press('h')
-                time.sleep(0.3)  # Wait for menu to toggle
-                
+            result = self.wait_for_element(house_start_criteria, timeout=2.0, check_interval=0.5)
+            
+            if result.success:
+                self._reset_h_backoff()
                 if attempt == 1:
-                    logger.info("Waiting for house_start to appear...")
+                    logger.info("House start button found after first 'h' press")
                 else:
-                    logger.info(f"Waiting for house_start to appear after {attempt}th 'h' press...")
-                
-                result = self.wait_for_element(house_start_criteria, timeout=2.0, check_interval=0.5)
-                
-                if result.success:
-                    if attempt == 1:
-                        logger.info("House start button found after first 'h' press")
-                    else:
-                        logger.info(f"House start button found after {attempt}th 'h' press")
-                    # Click the house_start button with retry logic
-                    return self._click_house_start_with_retry(house_start_criteria, outside_button_criteria)
-                else:
-                    if attempt < max_attempts:
-                        logger.info(f"House start button not found after {attempt}th 'h' press, trying again...")
-            
-            # If we get here, all attempts failed
-            logger.error(f"House start button not found after {max_attempts} 'h' presses")
-            return ActionResult.failure_result(f"House start button not found after {max_attempts} 'h' presses")
-            
-        except Exception as e:
-            logger.error(f"Failed to toggle housing menu and find house start: {e}")
-            return ActionResult.failure_result("Failed to toggle housing menu and find house start", error=e)
+                    logger.info(f"House start button found after {attempt}th 'h' press")
+                # Click the house_start button with retry logic
+                return self._click_house_start_with_retry(house_start_criteria, outside_button_criteria)
+            else:
+                self._record_failed_h_press()
+                if attempt < max_attempts:
+                    logger.info(f"House start button not found after {attempt}th 'h' press, trying again...")
+        
+        # If we get here, all attempts failed
+        logger.error(f"House start button not found after {max_attempts} 'h' presses")
+        return ActionResult.failure_result(f"House start button not found after {max_attempts} 'h' presses")
+    
+    def _record_failed_h_press(self):
+        """Count a press that did not bring up house_start; start a backoff window at the limit"""
+        self._h_failed_presses += 1
+        if self._h_failed_presses >= self.H_PRESS_FAILURE_LIMIT:
+            backoff = min(2.0 ** self._h_backoff_count, self.H_BACKOFF_MAX)
+            self._h_backoff_until = time.monotonic() + backoff
+            self._h_backoff_count += 1
+            self._h_failed_presses = 0
+            logger.warning(f"'h' presses keep failing; suppressing them for {backoff:.0f}s")
+    
+    def _reset_h_backoff(self):
+        """The menu toggled as expected, so forget past failures"""
+        self._h_failed_presses = 0
+        self._h_backoff_count = 0
+        self._h_backoff_until = 0.0
     
+    @_guarded("Failed to click house start button with retry")
     def _click_house_start_with_retry(self, house_start_criteria, outside_button_criteria) -> ActionResult:
         """Click house_start button with retry logic"""
-        try:
-            logger.info("House start button detected successfully")
-            
-            # Retry logic: try up to 3 times
-            max_retries = 3
-            for attempt in range(1, max_retries + 1):
-                logger.info(f"Attempt {attempt}/{max_retries}: Clicking house start button...")
-                
-                # Click the house_start button
-                click_result = self.find_and_click(house_start_criteria, wait_time=1.0, retries=1)
-                
-                if not click_result.success:
-                    logger.warning(f"Failed to click house start button on attempt {attempt}")
-                    if attempt < max_retries:
-                        logger.info("Moving mouse up 50 pixels and waiting 5 seconds before retry...")
-                        current_x, current_y = pyautogui.position()
-                        pyautogui.moveTo(current_x, current_y - 50)
-                        time.sleep(5.0)
-                        continue
-                    else:
-                        return ActionResult.failure_result("Failed to click house start button after all retries")
-                
-                # Wait 1 second and check for outside_button
-                logger.info("Waiting 1 second to check if outside button appears...")
-                time.sleep(1.0)
-                
-                if self.ui_detector.is_element_present(outside_button_criteria):
-                    logger.info(f"Success! Outside button appeared after attempt {attempt}")
-                    return ActionResult.success_result("House start button clicked successfully")
+        logger.info("House start button detected successfully")
+        
+        # Retry logic: try up to max_retries times
+        max_retries = self.max_retries
+        for attempt in range(1, max_retries + 1):
+            logger.info(f"Attempt {attempt}/{max_retries}: Clicking house start button...")
+            
+            # One capture answers both "did an earlier click already work?" and
+            # "where is house_start now?"
+            found = self.ui_detector.detect_many([house_start_criteria, outside_button_criteria])
+            if found[outside_button_criteria.name]:
+                logger.info(f"Outside button already visible on attempt {attempt}")
+                return ActionResult.success_result("House start button clicked successfully")
+            
+            if found[house_start_criteria.name]:
+                time.sleep(0.5)  # Same UI-stability pause find_and_click makes
+            
+            # Click house_start, then watch for outside_button, one grab per tick
+            flow_result = self._run_flow([(house_start_criteria, "click"), (outside_button_criteria, "wait")],
+                                         timeout=self.HOUSE_START_FLOW_TIMEOUT)
+            
+            if flow_result.success:
+                logger.info(f"Success! Outside button appeared after attempt {attempt}")
+                return ActionResult.success_result("House start button clicked successfully")
+            
+            if not flow_result.data or flow_result.data.get("stalled_step") != 1:
+                logger.warning(f"Failed to click house start button on attempt {attempt}")
+                if attempt < max_retries:
+                    self._nudge_mouse_and_back_off(attempt)
+                    continue
                 else:
-                    logger.warning(f"Outside button not found after attempt {attempt} - button may have been grayed out")
-                    if attempt < max_retries:
-                        logger.info("Moving mouse up 50 pixels and waiting 5 seconds before retry...")
-                        current_x, current_y = pyautogui.position()
-                        pyautogui.moveTo(current_x, current_y - 50)
-                        time.sleep(5.0)
-                    else:
-                        logger.error("Failed to get outside button to appear after all retries")
-                        return ActionResult.failure_result("Failed to navigate to house start: Outside button not found within timeout")
-            
-        except Exception as e:
-            logger.error(f"Failed to click house start button with retry: {e}")
-            return ActionResult.failure_result("Failed to click house start button with retry", error=e)
+                    return ActionResult.failure_result("Failed to click house start button after all retries")
+            else:
+                logger.warning(f"Outside button not found after attempt {attempt} - button may have been grayed out")
+                if attempt < max_retries:
+                    self._nudge_mouse_and_back_off(attempt)
+                else:
+                    logger.error("Failed to get outside button to appear after all retries")
+                    return ActionResult.failure_result("Failed to navigate to house start: Outside button not found within timeout")
+        
+        # Only reached when max_retries < 1 and no attempt was made
+        logger.error(f"House start button not clicked: max_retries is {max_retries}")
+        return ActionResult.failure_result(f"House start button not clicked: max_retries must be at least 1, got {max_retries}")
 
+    def _nudge_mouse_and_back_off(self, attempt: int):
+        """Move the mouse off the button and sleep before the next house_start attempt"""
+        delay = self._backoff_delay(attempt)
+        logger.info(f"Moving mouse up 50 pixels and waiting {delay:.1f} seconds before retry...")
+        current_x, current_y = win_input.get_cursor_position()
+        win_input.move_cursor(current_x, current_y - 50)
+        time.sleep(delay)
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with equal jitter: half the capped delay is fixed, half random"""
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    @_guarded("Failed to press 'H' key")
     def close_housing_menu(self) -> ActionResult:
         """Press the 'H' key to close the housing menu"""
-        try:
-            logger.info("Pressing 'H' key to close housing menu...")
-            
-            # Press 'H' key
-            pyautogui.press('h')
-            
-            # Wait a moment for the action to register
-            time.sleep(0.3)
-            
-            logger.info("'H' key pressed successfully - housing menu should be closed")
-            return ActionResult.success_result("'H' key pressed successfully - housing menu closed")
-            
-        except Exception as e:
-            logger.error(f"Failed to press 'H' key: {e}")
-            return ActionResult.failure_result("Failed to press 'H' key", error=e)
\ No newline at end of file
+        logger.info("Pressing 'H' key to close housing menu...")
+        
+        # Press 'H' key
+        win_input.press_key(win_input.VK_H)
+        self.ui_detector.invalidate_screenshot()
+        
+        # Return as soon as the menu's house_start button is gone
+        self._await_ui_change(lambda: not self.ui_detector.is_element_present(self.HOUSE_START_CRITERIA))
+        
+        self._in_house_cache = (0.0, None)
+        logger.info("'H' key pressed successfully - housing menu should be closed")
+        return ActionResult.success_result("'H' key pressed successfully - housing menu closed")
\ No newline at end of file
@@ -1,14 +1,17 @@
 """
 Launcher automation module
 """
+import dataclasses
 import subprocess
 import time
 from typing import Optional
 
 from src.core.automation_base import AutomationBase
 from src.core.action_result import ActionResult
-from src.core.element import ElementSearchCriteria, ElementType, DetectionMethod
+from src.core.element import ElementSearchCriteria, ElementType, DetectionMethod, BoundingBox
 from src.utils.logger import logger
+from src.utils.poll_schedule import PollSchedule
+from src.utils import win_input
 from src.utils.process_utils import ProcessUtils
 from src.constants import AssetPaths
 from config import config
@@ -16,9 +19,53 @@ from config import config
 class LauncherAutomation(AutomationBase):
     """Handles Wizard101 launcher automation"""
     
+    # Search criteria never change between calls, so build them once at import
+    PASSWORD_FIELD_CRITERIA = ElementSearchCriteria(
+        name="password_field",
+        element_type=ElementType.INPUT_FIELD,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.PASSWORD_FIELD),
+        confidence_threshold=0.7,
+        metadata={"description": "Password field to confirm launcher is ready"},
+        grayscale=True
+    )
+    LOGIN_BUTTON_FALLBACK_CRITERIA = ElementSearchCriteria(
+        name="login_button",
+        element_type=ElementType.BUTTON,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LOGIN_BUTTON),
+        confidence_threshold=0.6,
+        metadata={"description": "Login button as fallback to confirm launcher is ready"},
+        grayscale=True
+    )
+    PLAY_BUTTON_CRITERIA = ElementSearchCriteria(
+        name="play_button",
+        element_type=ElementType.BUTTON,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LAUNCHER_PLAY_BUTTON),
+        confidence_threshold=0.8,
+        detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
+        metadata={"description": "Play button to start the game"}
+    )
+    LOGIN_BUTTON_CRITERIA = ElementSearchCriteria(
+        name="login_button",
+        element_type=ElementType.BUTTON,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LOGIN_BUTTON),
+        confidence_threshold=0.7,
+        grayscale=True
+    )
+    
     def __init__(self, ui_detector):
         super().__init__(ui_detector)
+        
+        # Every template this automation matches is fixed, so decode them all up front
+        self.ui_detector.preload_templates([
+            self.PASSWORD_FIELD_CRITERIA, self.LOGIN_BUTTON_FALLBACK_CRITERIA,
+            self.PLAY_BUTTON_CRITERIA, self.LOGIN_BUTTON_CRITERIA
+        ])
+        
         self.launcher_process: Optional[subprocess.Popen] = None
+        # PID owning the launcher window: the spawned process, or one found already running
+        self.launcher_pid: Optional[int] = None
+        # Launcher window bounds once known; template matches are cropped to them
+        self.launcher_region: Optional[BoundingBox] = None
         
     def execute(self) -> ActionResult:
         """Execute launcher automation workflow"""
@@ -52,9 +99,19 @@ class LauncherAutomation(AutomationBase):
             
             from pathlib import Path
             launcher_path = Path(config.LAUNCHER_PATH)
+            
+            # Reuse a launcher left open by a previous run instead of spawning another
+            existing_pid = self._find_existing_launcher(launcher_path.stem)
+            if existing_pid is not None:
+                logger.info(f"Wizard101 launcher already open (PID: {existing_pid}) - reusing it")
+                self.launcher_process = None
+                self.launcher_pid = existing_pid
+                return ActionResult.success_result("Existing launcher reused")
+            
             self.launcher_process = subprocess.Popen([
                 str(launcher_path)
             ], cwd=launcher_path.parent)
+            self.launcher_pid = self.launcher_process.pid
             
             logger.info("Wizard101 launcher started successfully")
             return ActionResult.success_result("Game launched successfully")
@@ -66,71 +123,63 @@ class LauncherAutomation(AutomationBase):
         """Wait for the launcher to fully load"""
         logger.info(f"Waiting for launcher to load (timeout: {timeout}s)")
         
-        # Wait a bit for the launcher process to start
-        import time
-        time.sleep(3.0)
+        # Wait for the launcher window itself before paying for any template matching
+        if self.launcher_pid is not None:
+            start_time = time.monotonic()
+            window_ready = ProcessUtils.wait_for_process_window(self.launcher_pid, "Wizard101",
+                                                                timeout=timeout)
+            if window_ready is False:
+                logger.warning("Launcher window did not appear, checking the screen anyway")
+            elif window_ready:
+                logger.info(f"Launcher window appeared after {time.monotonic() - start_time:.1f}s")
+            timeout = max(timeout - (time.monotonic() - start_time), 2.0)
+            if window_ready:
+                rect = ProcessUtils.get_process_window_rect(self.launcher_pid, "Wizard101")
+                self.launcher_region = BoundingBox(*rect) if rect else None
         
-        # Define multiple criteria for detecting that launcher is ready
-        # Try different elements that might indicate the launcher is loaded
-        
-        # Look for login elements to confirm launcher is ready
-        # Try to find the password field first (most reliable indicator)
-        password_field_criteria = ElementSearchCriteria(
-            name="password_field",
-            element_type=ElementType.INPUT_FIELD,
-            template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.PASSWORD_FIELD),
-            confidence_threshold=0.7,
-            metadata={"description": "Password field to confirm launcher is ready"}
+        # Either login element means the launcher is ready, so look for both on
+        # the same frames; the password field wins when both are visible
+        result = self.wait_for_any_element(
+            [self._in_launcher(self.PASSWORD_FIELD_CRITERIA), self._in_launcher(self.LOGIN_BUTTON_FALLBACK_CRITERIA)],
+            timeout=timeout, check_interval=2.0, schedule=PollSchedule.for_element("launcher_ready")
         )
         
-        # Try to find the password field first
-        result = self.wait_for_element(password_field_criteria, timeout=timeout, check_interval=2.0)
-        
         if result.success:
-            logger.info("Launcher loaded successfully - password field found")
+            found = result.data["element"].name
+            logger.info(f"Launcher loaded successfully - {found.replace('_', ' ')} found")
             return ActionResult.success_result("Launcher loaded successfully")
         
-        # If password field not found, try to find the login button as fallback
-        logger.warning("Password field not found, trying login button as fallback...")
-        
-        login_button_criteria = ElementSearchCriteria(
-            name="login_button",
-            element_type=ElementType.BUTTON,
-            template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LOGIN_BUTTON),
-            confidence_threshold=0.6,
-            metadata={"description": "Login button as fallback to confirm launcher is ready"}
-        )
-        
-        result = self.wait_for_element(login_button_criteria, timeout=10.0, check_interval=2.0)
-        
-        if result.success:
-            logger.info("Launcher loaded successfully - login button found as fallback")
-            return ActionResult.success_result("Launcher loaded successfully")
-        
-        # If still not found, try a simple approach - wait for launcher window to be visible
+        # If neither was found, fall back to waiting for the screen to settle
         logger.warning("UI elements not detected, using fallback method...")
         
-        # Simple fallback: wait a fixed time and assume it's ready
+        # Fallback: wait until the screen stops changing and assume it's ready
         # This is not ideal but better than failing completely
-        logger.info("Using fallback: assuming launcher is ready after delay")
-        time.sleep(5.0)  # Give it a bit more time
+        logger.info("Using fallback: assuming launcher is ready once the screen settles")
+        if not self._wait_for_visual_stability(max_wait=5.0):
+            logger.warning("Screen still changing after 5.0s")
         
         return ActionResult.success_result("Launcher assumed ready (fallback method)")
     
+    def _find_existing_launcher(self, process_name: str) -> Optional[int]:
+        """PID of an already running launcher process that has its window open, if any"""
+        for proc in ProcessUtils.get_processes_by_name(process_name):
+            if ProcessUtils.has_visible_window(ProcessUtils.get_process_tree_pids(proc.pid), "Wizard101"):
+                return proc.pid
+        return None
+    
+    def _in_launcher(self, criteria: ElementSearchCriteria) -> ElementSearchCriteria:
+        """Criteria restricted to the launcher window when its bounds are known"""
+        if self.launcher_region is None or criteria.region is not None:
+            return criteria
+        return dataclasses.replace(criteria, region=self.launcher_region)
+    
     def click_play_button(self) -> ActionResult:
         """Click the play button to start the game"""
         try:
             logger.info("Looking for play button to click")
             
             # Define play button search criteria
-            play_button_criteria = ElementSearchCriteria(
-                name="play_button",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LAUNCHER_PLAY_BUTTON),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Play button to start the game"}
-            )
+            play_button_criteria = self._in_launcher(self.PLAY_BUTTON_CRITERIA)
             
             # Find and click the play button
             result = self.find_and_click(play_button_criteria, wait_time=1.0, retries=3)
@@ -158,7 +207,7 @@ class LauncherAutomation(AutomationBase):
             unfocus_y = screen_height // 3  # Upper third of screen
             
             logger.info(f"Clicking unfocus area at ({unfocus_x}, {unfocus_y})")
-            pyautogui.click(unfocus_x, unfocus_y)
+            win_input.click(unfocus_x, unfocus_y)
             time.sleep(0.5)
             
             return ActionResult.success_result("Fields unfocused successfully")
@@ -169,12 +218,7 @@ class LauncherAutomation(AutomationBase):
     def is_launcher_ready(self) -> bool:
         """Check if launcher is ready for interaction"""
         # Simple check - look for the login button
-        login_criteria = ElementSearchCriteria(
-            name="login_button",
-            element_type=ElementType.BUTTON,
-            template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LOGIN_BUTTON),
-            confidence_threshold=0.7
-        )
+        login_criteria = self._in_launcher(self.LOGIN_BUTTON_CRITERIA)
         
         return self.ui_detector.is_element_present(login_criteria)
     
@@ -5,6 +5,8 @@ from src.core.automation_base import AutomationBase
 from src.core.action_result import ActionResult
 from src.core.element import ElementSearchCriteria, ElementType, DetectionMethod
 from src.utils.logger import logger
+from src.utils import win_input
+from src.utils.poll_schedule import PollSchedule
 from src.utils.process_utils import ProcessUtils
 from src.constants import AssetPaths
 from config import config
@@ -12,8 +14,56 @@ from config import config
 class LoginAutomation(AutomationBase):
     """Handles Wizard101 login automation"""
     
+    # Search criteria never change between calls, so build them once at import
+    PASSWORD_FOCUSED_CRITERIA = ElementSearchCriteria(
+        name="password_field_focused",
+        element_type=ElementType.INPUT_FIELD,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.PASSWORD_FIELD_FOCUSED),
+        confidence_threshold=0.8,
+        detection_methods=[DetectionMethod.TEMPLATE],
+        metadata={"description": "Password field in focused state"}
+    )
+    PASSWORD_FIELD_CRITERIA = ElementSearchCriteria(
+        name="password_field",
+        element_type=ElementType.INPUT_FIELD,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.PASSWORD_FIELD),
+        confidence_threshold=0.8,
+        detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
+        metadata={"description": "Password field in unfocused state"}
+    )
+    LOGIN_BUTTON_CRITERIA = ElementSearchCriteria(
+        name="login_button",
+        element_type=ElementType.BUTTON,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LOGIN_BUTTON),
+        confidence_threshold=0.8,
+        detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
+        grayscale=True
+    )
+    DISABLED_PLAY_CRITERIA = ElementSearchCriteria(
+        name="disabled_play_button",
+        element_type=ElementType.BUTTON,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.DISABLED_PLAY_BUTTON),
+        confidence_threshold=0.8,
+        detection_methods=[DetectionMethod.TEMPLATE],
+        metadata={"description": "Disabled play button indicating login successful"}
+    )
+    PLAY_BUTTON_CRITERIA = ElementSearchCriteria(
+        name="play_button",
+        element_type=ElementType.BUTTON,
+        template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LAUNCHER_PLAY_BUTTON),
+        confidence_threshold=0.8,
+        detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
+        metadata={"description": "Enabled play button indicating game is loaded"}
+    )
+    
     def __init__(self, ui_detector):
         super().__init__(ui_detector)
+        
+        # Every template this automation matches is fixed, so decode them all up front
+        self.ui_detector.preload_templates([
+            self.PASSWORD_FOCUSED_CRITERIA, self.PASSWORD_FIELD_CRITERIA, self.LOGIN_BUTTON_CRITERIA,
+            self.DISABLED_PLAY_CRITERIA, self.PLAY_BUTTON_CRITERIA
+        ])
     
     def execute(self) -> ActionResult:
         """Execute login automation workflow"""
@@ -56,22 +106,15 @@ class LoginAutomation(AutomationBase):
             logger.info("Starting credential entry process")
             
             # First, check if password field is already focused
-            focused_criteria = ElementSearchCriteria(
-                name="password_field_focused",
-                element_type=ElementType.INPUT_FIELD,
-                template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.PASSWORD_FIELD_FOCUSED),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE],
-                metadata={"description": "Password field in focused state"}
-            )
+            focused_criteria = self.PASSWORD_FOCUSED_CRITERIA
             
             # Check if password field is focused
             if self.ui_detector.is_element_present(focused_criteria):
                 logger.info("Password field is already focused, typing password directly")
                 
                 # Just type the password directly
-                import pyautogui
-                pyautogui.typewrite(config.PASSWORD, interval=0.05)
+                win_input.type_text(config.PASSWORD)
+                self.ui_detector.invalidate_screenshot()
                 
                 logger.info("Password entered successfully (direct typing)")
                 return ActionResult.success_result("Credentials entered successfully (direct typing)")
@@ -80,14 +123,7 @@ class LoginAutomation(AutomationBase):
             logger.info("Password field not focused, using normal detection and typing")
             
             # Define unfocused password field search criteria
-            password_criteria = ElementSearchCriteria(
-                name="password_field",
-                element_type=ElementType.INPUT_FIELD,
-                template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.PASSWORD_FIELD),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Password field in unfocused state"}
-            )
+            password_criteria = self.PASSWORD_FIELD_CRITERIA
             
             # Find and type password
             result = self.find_and_type(password_criteria, config.PASSWORD)
@@ -107,13 +143,7 @@ class LoginAutomation(AutomationBase):
             logger.info("Looking for login button")
             
             # Define login button search criteria
-            login_criteria = ElementSearchCriteria(
-                name="login_button",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LOGIN_BUTTON),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL]
-            )
+            login_criteria = self.LOGIN_BUTTON_CRITERIA
             
             # Find and click login button
             result = self.find_and_click(login_criteria)
@@ -132,17 +162,11 @@ class LoginAutomation(AutomationBase):
         logger.info("Waiting for login to complete...")
         
         # Define criteria for disabled play button (indicates login successful)
-        disabled_play_criteria = ElementSearchCriteria(
-            name="disabled_play_button",
-            element_type=ElementType.BUTTON,
-            template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.DISABLED_PLAY_BUTTON),
-            confidence_threshold=0.8,
-            detection_methods=[DetectionMethod.TEMPLATE],
-            metadata={"description": "Disabled play button indicating login successful"}
-        )
+        disabled_play_criteria = self.DISABLED_PLAY_CRITERIA
         
         # Wait for disabled play button to appear (login complete)
-        result = self.wait_for_element(disabled_play_criteria, timeout=timeout, check_interval=2.0)
+        result = self.wait_for_element(disabled_play_criteria, timeout=timeout, check_interval=5.0,
+                                       schedule=PollSchedule.for_element("disabled_play_button"))
         
         if result.success:
             logger.info("Login completed successfully - disabled play button found")
@@ -157,17 +181,13 @@ class LoginAutomation(AutomationBase):
             logger.info("Waiting for game to load (enabled play button)...")
             
             # Define enabled play button search criteria
-            play_button_criteria = ElementSearchCriteria(
-                name="play_button",
-                element_type=ElementType.BUTTON,
-                template_path=config.get_launcher_template_path(AssetPaths.LauncherTemplates.LAUNCHER_PLAY_BUTTON),
-                confidence_threshold=0.8,
-                detection_methods=[DetectionMethod.TEMPLATE, DetectionMethod.VISUAL],
-                metadata={"description": "Enabled play button indicating game is loaded"}
-            )
+            play_button_criteria = self.PLAY_BUTTON_CRITERIA
             
             # Wait for enabled play button to appear (game loaded) - up to 5 minutes
-            result = self.wait_for_element(play_button_criteria, timeout=300.0, check_interval=5.0)
+            # Loading takes minutes, so polls stretch from 5s to 10s apart
+            result = self.wait_for_element(play_button_criteria, timeout=300.0, check_interval=5.0,
+                                           schedule=PollSchedule.for_element("play_button"),
+                                           backoff=1.5, max_interval=10.0)
             
             if not result.success:
                 logger.error("Game loading timeout - enabled play button not found")
@@ -175,8 +195,8 @@ class LoginAutomation(AutomationBase):
             
             logger.info("Game loaded successfully - enabled play button found")
             
-            # Now click the play button
-            click_result = self.find_and_click(play_button_criteria, wait_time=1.0, retries=3)
+            # Now click the play button where the wait just found it
+            click_result = self.click_last_seen(play_button_criteria)
             
             if click_result.success:
                 logger.info("Play button clicked successfully - game starting")
@@ -2,47 +2,134 @@
 Movement automation module
 Handles player movement and navigation based on garden configuration
 """
+import math
 import time
-import yaml
-import pyautogui
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 from src.core.automation_base import AutomationBase
 from src.core.action_result import ActionResult
 from src.core.element import ElementSearchCriteria, ElementType, DetectionMethod
+from src.utils import win_input
 from src.utils.logger import logger
+from src.utils.yaml_cache import load_yaml
 from src.constants import AssetPaths
 from config import config
 
+# id(config dict) -> (that dict, its compiled patterns) for configs seen recently.
+# Plain dicts cannot be weakly referenced, so the entry holds the dict itself;
+# that also stops its id being reused while cached
+_COMPILED_CACHE: "OrderedDict[int, tuple]" = OrderedDict()
+_COMPILED_CACHE_MAX = 8
+
+
 class MovementAutomation(AutomationBase):
-    """Handles player movement and navigation based on garden configuration"""
+    """
+    Handles player movement and navigation based on garden configuration
+    
+    garden_config loaded from file is shared between instances and must not be
+    modified in place.
+    """
+    
+    # Pause between consecutive commands of a pattern (none after the last one)
+    INTER_COMMAND_DELAY = 0.1
+    
+    # Final stretch of a key hold (seconds) timed by spinning rather than sleeping
+    HOLD_SPIN_WINDOW = 0.02
     
     def __init__(self, ui_detector, config=None):
         super().__init__(ui_detector)
         self.garden_config = None
+        # pattern name -> (validated (key, duration) steps, first invalid command or None)
+        self._compiled_patterns = {}
         if config:
             self.garden_config = config
+            self._compiled_patterns = self._compiled_patterns_for(config)
         else:
             self.load_garden_config()
     
     def load_garden_config(self) -> bool:
         """Load garden configuration from YAML file"""
         try:
-            config_path = Path("config/garden_config.yaml")
-            if not config_path.exists():
-                logger.error("Garden configuration file not found: config/garden_config.yaml")
-                return False
-            
-            with open(config_path, 'r') as file:
-                self.garden_config = yaml.safe_load(file)
+            parsed = load_yaml("config/garden_config.yaml")
+            self.garden_config = parsed
+            self._compiled_patterns = self._compiled_patterns_for(parsed)
             
             logger.info("Garden configuration loaded successfully")
             return True
             
+        except FileNotFoundError:
+            logger.error("Garden configuration file not found: config/garden_config.yaml")
+            return False
         except Exception as e:
             logger.error(f"Failed to load garden configuration: {e}")
             return False
     
+    @classmethod
+    def _compiled_patterns_for(cls, garden_config) -> Dict[str, tuple]:
+        """Compiled patterns for a config dict, reused when the very same object comes back"""
+        cached = _COMPILED_CACHE.get(id(garden_config))
+        if cached is not None and cached[0] is garden_config:
+            _COMPILED_CACHE.move_to_end(id(garden_config))
+            return cached[1]
+        
+        compiled = cls._compile_patterns(garden_config)
+        _COMPILED_CACHE[id(garden_config)] = (garden_config, compiled)
+        if len(_COMPILED_CACHE) > _COMPILED_CACHE_MAX:
+            _COMPILED_CACHE.popitem(last=False)
+        return compiled
+    
+    @staticmethod
+    def _compile_patterns(garden_config) -> Dict[str, tuple]:
+        """
+        Validate every movement pattern once into (key, duration) tuples
+        
+        A pattern is any top-level list in the config, or a mapping of the form
+        {mode: parallel | sequential, steps: [...]}. Commands are checked in
+        order; the first invalid one (wrong shape, or a duration that is not a
+        finite non-negative number) is logged, ends the compiled steps and is
+        kept so execute_pattern fails on it at the same point it always has. With
+        fuse_adjacent_commands set, back-to-back commands for the same key
+        become one hold of their combined duration.
+        
+        Returns pattern name -> (steps, first invalid command or None, parallel).
+        """
+        compiled = {}
+        if not isinstance(garden_config, dict):
+            return compiled
+        fuse = bool(garden_config.get("fuse_adjacent_commands", False))
+        for name, pattern in garden_config.items():
+            parallel = False
+            if isinstance(pattern, dict) and isinstance(pattern.get("steps"), list):
+                parallel = pattern.get("mode", "sequential") == "parallel"
+                pattern = pattern["steps"]
+            if not isinstance(pattern, list):
+                continue
+            steps = []
+            invalid = None
+            fused = 0
+            for command in pattern:
+                duration = None
+                if isinstance(command, dict) and "key" in command and "duration" in command:
+                    try:
+                        duration = float(command["duration"])
+                    except (TypeError, ValueError):
+                        pass
+                if duration is None or not math.isfinite(duration) or duration < 0:
+                    logger.warning(f"Invalid command in pattern '{name}': {command}")
+                    invalid = command
+                    break
+                key = str(command["key"])
+                if fuse and steps and steps[-1][0] == key:
+                    steps[-1] = (key, steps[-1][1] + duration)
+                    fused += 1
+                else:
+                    steps.append((key, duration))
+            if fused:
+                logger.debug("Fused %d adjacent command(s) in pattern '%s'", fused, name)
+            compiled[name] = (tuple(steps), invalid, parallel)
+        return compiled
+    
     def execute(self) -> ActionResult:
         """Execute movement automation workflow"""
         try:
@@ -67,80 +154,124 @@ class MovementAutomation(AutomationBase):
     
     def navigate_to_garden(self) -> ActionResult:
         """Navigate to the main garden area"""
-        try:
-            if not self.garden_config or "go_to_garden" not in self.garden_config:
-                return ActionResult.failure_result("Garden movement pattern not configured")
-            
-            logger.info("Navigating to garden area...")
-            
-            # Execute the go_to_garden pattern
-            result = self.execute_pattern("go_to_garden")
-            if result.success:
-                logger.info("Successfully navigated to garden")
-                return result
-            else:
-                return result
-            
-        except Exception as e:
-            logger.error(f"Failed to navigate to garden: {e}")
-            return ActionResult.failure_result("Failed to navigate to garden", error=e)
+        if "go_to_garden" not in self._compiled_patterns:
+            return ActionResult.failure_result("Garden movement pattern not configured")
+        
+        logger.info("Navigating to garden area...")
+        
+        # Execute the go_to_garden pattern; it reports its own failures
+        result = self.execute_pattern("go_to_garden")
+        if result.success:
+            logger.info("Successfully navigated to garden")
+        return result
     
     def execute_pattern(self, pattern_name: str) -> ActionResult:
         """Execute a movement pattern from the configuration"""
+        compiled = self._compiled_patterns.get(pattern_name)
+        if compiled is None:
+            return ActionResult.failure_result(f"Pattern '{pattern_name}' not found in configuration")
+        
+        steps, invalid, parallel = compiled
+        if parallel:
+            return self._execute_parallel_pattern(pattern_name, steps, invalid)
+        
+        total = len(steps) + (invalid is not None)
+        logger.info(f"Executing pattern: {pattern_name}")
+        
+        # Only sending input can fail here; one try covers the whole batch
+        i = 1
         try:
-            if not self.garden_config or pattern_name not in self.garden_config:
-                return ActionResult.failure_result(f"Pattern '{pattern_name}' not found in configuration")
-            
-            pattern = self.garden_config[pattern_name]
-            logger.info(f"Executing pattern: {pattern_name}")
-            
-            for i, command in enumerate(pattern):
-                logger.info(f"Executing command {i+1}/{len(pattern)}: {command}")
+            for i, (key, duration) in enumerate(steps, 1):
+                if i > 1:
+                    # Small delay between commands
+                    time.sleep(self.INTER_COMMAND_DELAY)
                 
-                result = self.execute_simple_command(command)
-                if not result.success:
-                    return ActionResult.failure_result(f"Pattern command failed: {command}")
+                logger.debug("Executing command %d/%d: key=%s duration=%s", i, total, key, duration)
                 
-                # Small delay between commands
-                time.sleep(0.1)
-            
-            logger.info(f"Pattern '{pattern_name}' executed successfully")
-            return ActionResult.success_result(f"Pattern '{pattern_name}' executed successfully")
-            
+                self._press_key_fast(key, duration)
         except Exception as e:
-            logger.error(f"Failed to execute pattern {pattern_name}: {e}")
+            logger.error(f"Failed to execute pattern {pattern_name} at command {i}/{total}: {e}")
             return ActionResult.failure_result(f"Failed to execute pattern {pattern_name}", error=e)
+        
+        if invalid is not None:
+            logger.error(f"Invalid command format: {invalid}")
+            return ActionResult.failure_result(f"Pattern command failed: {invalid}")
+        
+        logger.info(f"Pattern '{pattern_name}' executed successfully")
+        return ActionResult.success_result(f"Pattern '{pattern_name}' executed successfully")
+    
+    def _execute_parallel_pattern(self, pattern_name: str, steps: tuple, invalid) -> ActionResult:
+        """
+        Run a parallel-mode pattern: each distinct key gets its own worker that
+        plays that key's commands in order, so different keys are held at the
+        same time while the same key is never pressed by two workers at once
+        """
+        # Nothing has been pressed yet, so a bad command fails the whole pattern up front
+        if invalid is not None:
+            logger.error(f"Invalid command format: {invalid}")
+            return ActionResult.failure_result(f"Pattern command failed: {invalid}")
+        
+        lanes: Dict[str, List[float]] = {}
+        for key, duration in steps:
+            lanes.setdefault(key, []).append(duration)
+        logger.info(f"Executing pattern: {pattern_name} (parallel, issue order: {', '.join(lanes)})")
+        
+        def run_lane(key: str, durations: List[float]):
+            for i, duration in enumerate(durations):
+                if i:
+                    time.sleep(self.INTER_COMMAND_DELAY)
+                self._press_key_fast(key, duration)
+        
+        with ThreadPoolExecutor(max_workers=max(len(lanes), 1)) as executor:
+            futures = [executor.submit(run_lane, key, durations) for key, durations in lanes.items()]
+            errors = [future.exception() for future in futures]
+        
+        error = next((e for e in errors if e is not None), None)
+        if error is not None:
+            logger.error(f"Failed to execute pattern {pattern_name}: {error}")
+            return ActionResult.failure_result(f"Failed to execute pattern {pattern_name}", error=error)
+        
+        logger.info(f"Pattern '{pattern_name}' executed successfully")
+        return ActionResult.success_result(f"Pattern '{pattern_name}' executed successfully")
     
     def execute_simple_command(self, command) -> ActionResult:
         """Execute a simple movement command"""
-        try:
-            if isinstance(command, dict) and "key" in command and "duration" in command:
-                # Handle key press commands like "key: w, duration: 2.5"
-                key = command["key"]
-                duration = command["duration"]
-                return self.press_key(key, duration)
-            else:
-                return ActionResult.failure_result(f"Invalid command format: {command}")
-                
-        except Exception as e:
-            logger.error(f"Failed to execute command {command}: {e}")
-            return ActionResult.failure_result(f"Failed to execute command", error=e)
+        # press_key turns its own failures into an ActionResult
+        if isinstance(command, dict) and "key" in command and "duration" in command:
+            # Handle key press commands like "key: w, duration: 2.5"
+            return self.press_key(command["key"], command["duration"])
+        return ActionResult.failure_result(f"Invalid command format: {command}")
     
     def press_key(self, key: str, duration: float) -> ActionResult:
         """Press and hold a key for a specified duration"""
         try:
-            logger.info(f"Pressing key '{key}' for {duration} seconds")
+            logger.debug("Pressing key '%s' for %s seconds", key, duration)
             
-            # Press and hold the key
-            pyautogui.keyDown(key)
-            time.sleep(duration)
-            pyautogui.keyUp(key)
+            self._press_key_fast(key, duration)
             
-            logger.info(f"Successfully pressed key '{key}' for {duration} seconds")
+            logger.debug("Successfully pressed key '%s' for %s seconds", key, duration)
             return ActionResult.success_result(f"Pressed key '{key}' for {duration} seconds")
             
         except Exception as e:
             logger.error(f"Failed to press key '{key}': {e}")
             return ActionResult.failure_result(f"Failed to press key '{key}'", error=e)
     
-    
+    def _press_key_fast(self, key: str, duration: float):
+        """Hold a key for duration seconds; arguments must already be validated"""
+        # Bound per call rather than as default arguments, so the spin loop reads
+        # locals while mock.patch on the modules still takes effect
+        clock = time.perf_counter
+        sleep = time.sleep
+        spin_window = self.HOLD_SPIN_WINDOW
+        # Straight to SendInput: no pyautogui PAUSE sleep, failsafe or name mapping per call
+        win_input.key_down(key)
+        deadline = clock() + duration
+        # Sleep most of the hold, then spin the last few milliseconds: time.sleep
+        # can overshoot by a whole scheduler tick (~15ms on Windows)
+        while True:
+            remaining = deadline - clock()
+            if remaining <= 0:
+                break
+            if remaining > spin_window:
+                sleep(remaining - spin_window)
+        win_input.key_up(key)
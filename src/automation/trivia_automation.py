@@ -2,18 +2,25 @@
 Trivia automation module for Wizard101 trivia bot
 Handles browser navigation and trivia-specific tasks
 """
+import dataclasses
+import functools
+import re
 import subprocess
 import time
-import pyautogui
-import yaml
 import os
 import pyperclip
+import numpy as np
+from typing import Optional
 from src.core.automation_base import AutomationBase
 from src.core.action_result import ActionResult
-from src.core.element import ElementSearchCriteria, ElementType, DetectionMethod
+from src.core.element import ElementSearchCriteria, ElementType, DetectionMethod, BoundingBox
+from src.utils import win_input
 from src.utils.logger import logger
 from src.utils.screenshot import ScreenshotManager
 from src.utils.bot_execution_tracker import TriviaBotTracker
+from src.utils.process_utils import ProcessUtils
+from src.utils.screen_capture import grab_screen
+from src.utils.yaml_cache import load_yaml
 from config import config
 from src.constants import AssetPaths, AutomationConstants
 
@@ -26,12 +33,15 @@ ANSWER_POSITIONS = {
 }
 
 # UI Element Configuration
-# Defines template paths and interaction parameters for all trivia elements
+# Defines template paths and interaction parameters for all trivia elements.
+# Templates large enough to stay distinctive at half size set scale_steps, so a
+# cheap downscaled pass runs first and the full-size match only near its hit
 UI_ELEMENTS = {
     "W101_LOGO": {
         "name": "W101 Logo",
         "template": AssetPaths.TriviaTemplates.W101_LOGO,
-        "timeout": 20.0
+        "timeout": 20.0,
+        "scale_steps": [1.0, 0.5]
     },
     "LOGIN_BUTTON": {
         "name": "Login Button",
@@ -43,7 +53,8 @@ UI_ELEMENTS = {
         "name": "Trivia Banner",
         "template": AssetPaths.TriviaTemplates.TRIVIA_BANNER,
         "timeout": 1.5,
-        "confidence": AutomationConstants.TRIVIA_CONFIDENCE_THRESHOLD
+        "confidence": AutomationConstants.TRIVIA_CONFIDENCE_THRESHOLD,
+        "scale_steps": [1.0, 0.5]
     },
     "SUBMIT_BUTTON": {
         "name": "Submit Answer Button",
@@ -55,7 +66,8 @@ UI_ELEMENTS = {
         "name": "Claim Your Reward Button",
         "template": AssetPaths.TriviaTemplates.CLAIM_YOUR_REWARD_BUTTON,
         "timeout": 15.0,
-        "post_click_delay": 0.0
+        "post_click_delay": 0.0,
+        "scale_steps": [1.0, 0.5]
     },
     "CLAIM_REWARD_2": {
         "name": "Second Claim Your Reward Button",
@@ -66,7 +78,8 @@ UI_ELEMENTS = {
     "TAKE_ANOTHER_QUIZ": {
         "name": "Take Another Quiz Button",
         "template": AssetPaths.TriviaTemplates.TAKE_ANOTHER_QUIZ_BUTTON,
-        "timeout": 15.0
+        "timeout": 15.0,
+        "scale_steps": [1.0, 0.5]
     },
     "GOOGLE_SEARCH_ICON": {
         "name": "Google Search Icon",
@@ -76,9 +89,65 @@ UI_ELEMENTS = {
 }
 
 
+@functools.lru_cache(maxsize=1)
+def _find_chrome_path() -> Optional[str]:
+    """Path to chrome.exe from its App Paths registration or a common install location"""
+    try:
+        import winreg
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths\chrome.exe") as key:
+                    path = winreg.QueryValueEx(key, "")[0]
+                if path and os.path.exists(path):
+                    return path
+            except OSError:
+                continue
+    except ImportError:
+        pass  # Not on Windows
+    
+    # Common Chrome paths on Windows
+    chrome_paths = [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+        os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe")
+    ]
+    for path in chrome_paths:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# Punctuation and whitespace runs, collapsed to single spaces when comparing text
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
+
+def _normalize_question(text: str) -> str:
+    """Lowercase a question and reduce punctuation and whitespace runs to single spaces"""
+    return _WS_RE.sub(' ', _PUNCT_RE.sub(' ', text.lower())).strip()
+
+
 class TriviaAutomation(AutomationBase):
     """Automation module for Wizard101 trivia bot"""
     
+    # Pixels added on each side of the last banner hit when searching near it
+    BANNER_SEARCH_MARGIN = 100
+    
+    # Question banner polling: total wait, first interval and the cap it backs
+    # off to (seconds), and the pause before re-checking a first sighting
+    BANNER_WAIT_TIMEOUT = 15.0
+    BANNER_POLL_INTERVAL = 0.1
+    BANNER_POLL_MAX_INTERVAL = 0.5
+    BANNER_CONFIRM_DELAY = 0.05
+    
+    # Longest wait (seconds) for a copy to reach the clipboard
+    CLIPBOARD_TIMEOUT = 0.3
+    
+    # Longest wait (seconds) for a navigated-to page to replace the old one, and
+    # for it to finish drawing once its logo is up
+    PAGE_LOAD_TIMEOUT = 10.0
+    PAGE_SETTLE_TIMEOUT = 2.0
+    
     def __init__(self, ui_detector):
         super().__init__(ui_detector)
         self.name = "Trivia Automation"
@@ -86,6 +155,39 @@ class TriviaAutomation(AutomationBase):
         self.trivia_database = self._load_trivia_database()
         self.execution_tracker = TriviaBotTracker()
         self.current_question_count = 0
+        
+        # (element key, element type, confidence) -> criteria, built once per combination
+        self._criteria_cache = {}
+        
+        # trivia name -> lookup tables for its questions, see _question_index
+        self._question_indexes = {}
+        
+        # Banner criteria restricted to around where the banner was last found;
+        # the page layout is the same for every question
+        self._banner_nearby_criteria = None
+        
+        # Every UI_ELEMENTS template is fixed, so decode them all up front
+        self.ui_detector.preload_templates([self._element_criteria(key) for key in UI_ELEMENTS])
+    
+    def _element_criteria(self, element_key: str, element_type: ElementType = ElementType.BUTTON,
+                          confidence: float = None) -> ElementSearchCriteria:
+        """Search criteria for a UI_ELEMENTS entry, reused across calls"""
+        config_data = UI_ELEMENTS[element_key]
+        if confidence is None:
+            confidence = config_data.get("confidence", AutomationConstants.TRIVIA_CONFIDENCE_THRESHOLD)
+        
+        key = (element_key, element_type, confidence)
+        criteria = self._criteria_cache.get(key)
+        if criteria is None:
+            criteria = self._criteria_cache[key] = ElementSearchCriteria(
+                name=config_data.get("name", element_key),
+                element_type=element_type,
+                template_path=config.get_trivia_template_path(config_data.get("template")),
+                confidence_threshold=confidence,
+                detection_methods=[DetectionMethod.TEMPLATE],
+                scale_steps=config_data.get("scale_steps")
+            )
+        return criteria
     
     def is_time_to_run(self) -> bool:
         """Check if it's time to run the trivia bot based on the 20-hour schedule"""
@@ -117,17 +219,12 @@ class TriviaAutomation(AutomationBase):
             
         config_data = UI_ELEMENTS[element_key]
         name = config_data.get("name", element_key)
-        template = config_data.get("template")
         timeout = kwargs.get("timeout", config_data.get("timeout", 15.0))
-        confidence = kwargs.get("confidence", config_data.get("confidence", AutomationConstants.TRIVIA_CONFIDENCE_THRESHOLD))
         
-        # Create search criteria
-        criteria = ElementSearchCriteria(
-            name=name,
-            element_type=ElementType.BUTTON if action != "wait_disappear" else ElementType.IMAGE,
-            template_path=config.get_trivia_template_path(template),
-            confidence_threshold=confidence,
-            detection_methods=[DetectionMethod.TEMPLATE]
+        criteria = self._element_criteria(
+            element_key,
+            ElementType.BUTTON if action != "wait_disappear" else ElementType.IMAGE,
+            kwargs.get("confidence")
         )
         
         if action == "wait_disappear":
@@ -155,9 +252,10 @@ class TriviaAutomation(AutomationBase):
                     target_x = center.x - 50
                     target_y = center.y
                     
-                    pyautogui.moveTo(target_x, target_y)
+                    # Hover first so the button's hover state is in place before the click
+                    win_input.move_cursor(target_x, target_y)
                     time.sleep(0.1)
-                    pyautogui.click()
+                    win_input.click(target_x, target_y)
                     
                     post_delay = kwargs.get("post_click_delay", config_data.get("post_click_delay", 0.2))
                     if post_delay > 0:
@@ -190,6 +288,8 @@ class TriviaAutomation(AutomationBase):
             attempt = 0
             completed_trivias = set()
             skipped_trivias = set()  # Track trivias that are already completed
+            # Trivias still to try, in database order; processed ones are removed
+            pending_trivias = list(self.trivia_database)
             
             while attempt < max_attempts:
                 attempt += 1
@@ -202,7 +302,7 @@ class TriviaAutomation(AutomationBase):
                         return result
                     
                     # Wait for W101 logo to confirm we're on the site
-                    result = self._interact_with_element("W101_LOGO", action="wait")
+                    result = self._wait_for_w101_logo()
                     if not result.success:
                         logger.error(f"Failed to find W101 logo: {result.message}")
                         return result
@@ -214,7 +314,7 @@ class TriviaAutomation(AutomationBase):
                         return result
                 
                 # Look for and complete one trivia
-                result = self._find_and_complete_single_trivia(completed_trivias, skipped_trivias)
+                result = self._find_and_complete_single_trivia(pending_trivias, skipped_trivias)
                 if not result.success:
                     logger.info(f"No more trivias available on attempt {attempt}. Completed {len(completed_trivias)} trivias total, skipped {len(skipped_trivias)} already completed.")
                     break
@@ -223,9 +323,6 @@ class TriviaAutomation(AutomationBase):
                 if hasattr(result, 'data') and 'trivia_name' in result.data:
                     completed_trivias.add(result.data['trivia_name'])
                     logger.info(f"Completed trivia: {result.data['trivia_name']}. Total completed: {len(completed_trivias)}")
-                
-                # Wait a bit before next attempt
-                time.sleep(0.5)
             
             logger.info(f"Trivia automation completed successfully. Total trivias completed: {len(completed_trivias)}")
             
@@ -262,24 +359,18 @@ class TriviaAutomation(AutomationBase):
     def _open_chrome(self) -> ActionResult:
         """Open Chrome browser and navigate to main trivia page directly"""
         try:
-            logger.info("Opening Chrome browser...")
-            
-            # Common Chrome paths on Windows
-            chrome_paths = [
-                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-                os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe")
-            ]
-            
-            found_chrome_path = None
-            for path in chrome_paths:
-                if os.path.exists(path):
-                    found_chrome_path = path
-                    break
-            
             # Target URL
             target_url = "https://www.wizard101.com/game/trivia"
             
+            # A Chrome window left on the site by an earlier run is reused as is:
+            # no browser start-up, and its session is usually still logged in
+            if self._reuse_existing_chrome(target_url):
+                return ActionResult.success_result("Existing browser window reused")
+            
+            logger.info("Opening Chrome browser...")
+            
+            found_chrome_path = _find_chrome_path()
+            
             # Method 1: Use full path if found - DIRECT NAVIGATION
             if found_chrome_path:
                 try:
@@ -291,20 +382,20 @@ class TriviaAutomation(AutomationBase):
                     logger.error(f"Failed to open Chrome with found path: {e}")
                     return ActionResult.failure_result(f"Failed to open Chrome: {e}", error=e)
             else:
-                # Fallback: Try 'start' command with URL if we can't find Chrome executable
-                # This lets Windows handle the default browser (which hopefully is Chrome or handles the site)
+                # Fallback: open the URL with the default browser if we can't find Chrome
+                # (which hopefully is Chrome or handles the site). ShellExecute needs no cmd.exe host
                 try:
                     logger.info("Chrome executable not found in common locations, trying system default browser...")
-                    subprocess.Popen(f'start {target_url}', shell=True)
-                    logger.info("Opened default browser with start command")
+                    if hasattr(os, "startfile"):
+                        os.startfile(target_url)
+                    else:
+                        subprocess.Popen(f'start {target_url}', shell=True)
+                    logger.info("Opened default browser")
                 except Exception as e:
                     logger.error(f"Failed to open default browser: {e}")
                     return ActionResult.failure_result(f"Could not open browser: {e}")
             
-            # Wait for browser to open and load
-            logger.info("Waiting for browser to initialize...")
-            time.sleep(0.5)
-            
+            # The caller waits for the W101 logo, which covers the browser starting up
             return ActionResult.success_result("Browser opened successfully")
             
         except Exception as e:
@@ -331,31 +422,24 @@ class TriviaAutomation(AutomationBase):
                 trivia_url = "https://www.wizard101.com/quiz/trivia/game/kingsisle-trivia"
             
             # Take a screenshot of current state
-            screenshot = self.screenshot_manager.take_screenshot()
-            if screenshot is not None:
-                self.screenshot_manager.save_screenshot(screenshot, "chrome_before_navigation")
-            
-            # Use pyautogui to navigate to the URL
-            import pyautogui
-            
-            # Click on address bar (Ctrl+L)
-            pyautogui.hotkey('ctrl', 'l')
-            time.sleep(0.1)
-            
-            # Type the URL
-            pyautogui.write(trivia_url)
-            time.sleep(0.1)
-            
-            # Press Enter to navigate
-            pyautogui.press('enter')
-            
-            logger.info(f"Navigated to: {trivia_url}")
-            
-            # Wait for page to load and take screenshot
-            time.sleep(1.0)
-            screenshot = self.screenshot_manager.take_screenshot()
-            if screenshot is not None:
-                self.screenshot_manager.save_screenshot(screenshot, "trivia_page_loaded")
+            self.screenshot_manager.capture_and_save("chrome_before_navigation")
+            
+            # Without these checks a page still loading would be missing its
+            # trivia banner too and get skipped as already completed. The old
+            # trivia page shows the logo as well, so the logo only counts once
+            # the old page has been replaced
+            if not self._enter_url(trivia_url):
+                logger.warning(f"Page content did not change after navigating to {trivia_url}")
+            logo_result = self._wait_for_w101_logo(timeout=self.PAGE_LOAD_TIMEOUT)
+            if not logo_result.success:
+                logger.warning(f"Wizard101 logo not found after navigating to {trivia_url}")
+                self.screenshot_manager.capture_and_save("trivia_page_not_loaded")
+                return ActionResult.failure_result(f"Trivia page did not load: {trivia_url}")
+            # Let the rest of the page, banner included, finish drawing
+            self._wait_for_visual_stability(max_wait=self.PAGE_SETTLE_TIMEOUT, interval=0.1)
+            
+            # Take screenshot of the loaded page
+            self.screenshot_manager.capture_and_save("trivia_page_loaded")
             
             return ActionResult.success_result(f"Successfully navigated to {trivia_name or 'main trivia'} page")
             
@@ -363,14 +447,61 @@ class TriviaAutomation(AutomationBase):
             logger.error(f"Error navigating to trivia page: {e}")
             return ActionResult.failure_result(f"Failed to navigate to trivia page: {e}", error=e)
     
-    def _wait_for_w101_logo(self) -> ActionResult:
+    def _enter_url(self, url: str, timeout: Optional[float] = None) -> bool:
+        """
+        Load a URL in the focused browser window and wait for the old page to go away
+        
+        Returns False if the page content had not changed within timeout (default
+        PAGE_LOAD_TIMEOUT) or the screen could not be captured, e.g. when both
+        pages look alike.
+        """
+        # Click on address bar (Ctrl+L). Keystrokes are queued in order behind
+        # the hotkey, so no pauses are needed between them
+        win_input.hotkey('ctrl', 'l')
+        
+        # Type the URL
+        win_input.type_text(url)
+        
+        # Press Enter to navigate, then wait for the screen to start changing
+        before = grab_screen()
+        win_input.hotkey('enter')
+        
+        logger.info(f"Navigated to: {url}")
+        
+        if before is None:
+            return False
+        # Enter closes the omnibox dropdown, which changes the top of the window
+        # straight away; only the lower half, old page content the dropdown does
+        # not reach, shows the new page has been drawn
+        top = before.shape[0] // 2
+        old_content = before[top:]
+        
+        def new_page_drawn() -> bool:
+            frame = grab_screen()
+            return frame is not None and frame.shape == before.shape and \
+                not np.array_equal(frame[top:], old_content)
+        
+        timeout = self.PAGE_LOAD_TIMEOUT if timeout is None else timeout
+        return self.wait_for_condition(new_page_drawn, timeout=timeout, check_interval=0.05,
+                                       condition_name="new page drawn").success
+    
+    def _reuse_existing_chrome(self, url: str) -> bool:
+        """Focus a running Chrome window showing the Wizard101 site and load url in it"""
+        # Chrome runs many processes; the window belongs to the browser one, so check them all at once
+        pids = {proc.pid for proc in ProcessUtils.get_processes_by_name("chrome")}
+        if not pids or not ProcessUtils.focus_process_window(pids, "Wizard101"):
+            return False
+        
+        logger.info("Reusing open Chrome window on the Wizard101 site")
+        # The window may already show this page, so do not wait long for a change;
+        # the caller waits for the site's logo regardless
+        self._enter_url(url, timeout=1.0)
+        return True
+    
+    def _wait_for_w101_logo(self, **kwargs) -> ActionResult:
         """Wait for W101 logo to confirm we're on the site"""
         try:
-            return self._wait_for_trivia_button(
-                "W101 Logo",
-                AssetPaths.TriviaTemplates.W101_LOGO,
-                timeout=20.0
-            )
+            return self._interact_with_element("W101_LOGO", action="wait", **kwargs)
         except Exception as e:
             logger.error(f"Error waiting for W101 logo: {e}")
             return ActionResult.failure_result(f"Failed to wait for W101 logo: {e}", error=e)
@@ -381,13 +512,7 @@ class TriviaAutomation(AutomationBase):
             logger.info("Checking if login is needed...")
             
             # Look for login button to determine if login is needed
-            login_button_criteria = ElementSearchCriteria(
-                name="Login Button",
-                element_type=ElementType.BUTTON,
-                detection_methods=[DetectionMethod.TEMPLATE],
-                confidence_threshold=AutomationConstants.TRIVIA_CONFIDENCE_THRESHOLD,
-                template_path=config.get_trivia_template_path(AssetPaths.TriviaTemplates.LOGIN_BUTTON)
-            )
+            login_button_criteria = self._element_criteria("LOGIN_BUTTON")
             
             # Try to find the login button
             login_button_element = self.ui_detector.find_element(login_button_criteria)
@@ -396,23 +521,13 @@ class TriviaAutomation(AutomationBase):
                 logger.info(f"Found login button at {login_button_element.bounding_box} - login required")
                 
                 # Take a screenshot before login
-                screenshot = self.screenshot_manager.take_screenshot()
-                if screenshot is not None:
-                    self.screenshot_manager.save_screenshot(screenshot, "before_login")
+                self.screenshot_manager.capture_and_save("before_login")
                 
-                # Move mouse to login button center
+                # Click 60 pixels above the login button center, in the login field
                 center = login_button_element.center
-                pyautogui.moveTo(center.x, center.y)
-                logger.info(f"Moved mouse to login button: ({center.x}, {center.y})")
-                
-                # Move mouse up 80 pixels from login button
                 click_y = center.y - 60
-                pyautogui.moveTo(center.x, click_y)
-                logger.info(f"Moved mouse up 60 pixels to click position: ({center.x}, {click_y})")
-                
-                # Click at the adjusted position
-                pyautogui.click(center.x, click_y)
-                logger.info("Clicked at adjusted position")
+                win_input.click(center.x, click_y)
+                logger.info(f"Clicked 60 pixels above login button at ({center.x}, {click_y})")
                 
                 # Clear the field and enter username
                 result = self._enter_username()
@@ -420,9 +535,7 @@ class TriviaAutomation(AutomationBase):
                     return result
                 
                 # Take screenshot after entering username
-                screenshot = self.screenshot_manager.take_screenshot()
-                if screenshot is not None:
-                    self.screenshot_manager.save_screenshot(screenshot, "after_username_entered")
+                self.screenshot_manager.capture_and_save("after_username_entered")
                 
                 return ActionResult.success_result("Login completed successfully")
             else:
@@ -446,15 +559,13 @@ class TriviaAutomation(AutomationBase):
             
             logger.info(f"Entering username: {username}")
             
-            # Clear the field using Ctrl+A and Delete
-            pyautogui.hotkey('ctrl', 'a')  # Select all text
-            time.sleep(0.1)
-            pyautogui.press('delete')  # Delete selected text
-            time.sleep(0.1)
+            # Clear the field using Ctrl+A and Delete; keystrokes are delivered in
+            # order, so they need no pauses between them
+            win_input.hotkey('ctrl', 'a')  # Select all text
+            win_input.hotkey('delete')  # Delete selected text
             
-            # Type the username with visible typing
-            pyautogui.write(username, interval=0.005)  # Fast typing
-            time.sleep(0.2)
+            # Type the username; every character goes out in one SendInput call
+            win_input.type_text(username)
             
             logger.info("Username entered successfully")
             
@@ -484,26 +595,25 @@ class TriviaAutomation(AutomationBase):
             obfuscated_password = password[:2] + "*" * (len(password) - 2) if len(password) > 2 else "*" * len(password)
             logger.info(f"Entering password: {obfuscated_password}")
             
-            # Press Tab to move to password field
-            pyautogui.press('tab')
-            time.sleep(0.3)
+            # Press Tab to move to password field; the browser moves focus before
+            # handling the keystrokes queued behind it
+            win_input.hotkey('tab')
             
             # Clear the password field
-            pyautogui.hotkey('ctrl', 'a')  # Select all text
-            time.sleep(0.1)
-            pyautogui.press('delete')  # Delete selected text
-            time.sleep(0.1)
+            win_input.hotkey('ctrl', 'a')  # Select all text
+            win_input.hotkey('delete')  # Delete selected text
             
-            # Type the password with visible typing
-            pyautogui.write(password, interval=0.005)  # Fast typing
-            time.sleep(0.2)
+            # Type the password the same way; unlike a paste, it never touches the clipboard
+            win_input.type_text(password)
             
             logger.info("Password entered successfully")
             
             # Press Enter to submit login form
             logger.info("Pressing Enter to submit login form...")
-            pyautogui.press('enter')
-            time.sleep(0.5)  # Wait for login to process
+            win_input.hotkey('enter')
+            
+            # The login form closes once the login has been processed
+            self._interact_with_element("LOGIN_BUTTON", action="wait_disappear")
             
             logger.info("Login form submitted")
             return ActionResult.success_result("Password entered and login form submitted")
@@ -516,20 +626,24 @@ class TriviaAutomation(AutomationBase):
         """Load trivia database from YAML file"""
         try:
             trivia_db_path = "config/trivia_database.yaml"
-            if not os.path.exists(trivia_db_path):
-                logger.warning(f"Trivia database file not found: {trivia_db_path}")
-                return {}
+            # Parsed once per content and cached on disk, so reloads skip the YAML parser
+            data = load_yaml(trivia_db_path)
+            return data.get('trivias', {})
             
-            with open(trivia_db_path, 'r') as file:
-                data = yaml.safe_load(file)
-                return data.get('trivias', {})
-                
+        except FileNotFoundError:
+            logger.warning(f"Trivia database file not found: {trivia_db_path}")
+            return {}
         except Exception as e:
             logger.error(f"Error loading trivia database: {e}")
             return {}
     
-    def _find_and_complete_single_trivia(self, completed_trivias: set, skipped_trivias: set) -> ActionResult:
-        """Find and complete a single trivia using URL-based navigation"""
+    def _find_and_complete_single_trivia(self, pending_trivias: list, skipped_trivias: set) -> ActionResult:
+        """
+        Find and complete a single trivia using URL-based navigation
+        
+        Trivias completed here or found already done are removed from pending_trivias;
+        ones that failed stay in it to be tried again on the next attempt.
+        """
         try:
             logger.info("Looking for available trivia...")
             
@@ -539,8 +653,7 @@ class TriviaAutomation(AutomationBase):
             
             # Calculate how many trivias are left to try
             total_trivias = len(self.trivia_database)
-            processed_trivias = len(completed_trivias) + len(skipped_trivias)
-            remaining_trivias = total_trivias - processed_trivias
+            remaining_trivias = len(pending_trivias)
             
             if remaining_trivias == 0:
                 logger.info("All trivias have been processed")
@@ -548,13 +661,8 @@ class TriviaAutomation(AutomationBase):
             
             logger.info(f"Trying trivias: {remaining_trivias} remaining out of {total_trivias} total")
             
-            # Try each trivia in the database until we find one that works
-            for trivia_name, trivia_data in self.trivia_database.items():
-                # Skip trivias we've already completed or determined are completed
-                if trivia_name in completed_trivias or trivia_name in skipped_trivias:
-                    logger.debug(f"Skipping {trivia_name} - already processed")
-                    continue
-                
+            # Try each pending trivia until we find one that works
+            for trivia_name in list(pending_trivias):
                 logger.info(f"Trying trivia: {trivia_name}")
                 
                 # Navigate directly to this trivia's URL
@@ -568,12 +676,14 @@ class TriviaAutomation(AutomationBase):
                 if not result.success:
                     logger.info(f"Trivia banner not found for {trivia_name} - trivia already completed, skipping to next trivia")
                     skipped_trivias.add(trivia_name)
+                    pending_trivias.remove(trivia_name)
                     continue
                 
                 # Try to complete this trivia
                 result = self._complete_single_trivia(trivia_name)
                 if result.success:
                     logger.info(f"Successfully completed trivia: {trivia_name}")
+                    pending_trivias.remove(trivia_name)
                     return ActionResult.success_result(f"Successfully completed trivia: {trivia_name}", data={'trivia_name': trivia_name})
                 else:
                     logger.warning(f"Failed to complete trivia {trivia_name}: {result.message}")
@@ -685,8 +795,8 @@ class TriviaAutomation(AutomationBase):
                     continue
                 
                 # Reset mouse position by moving up 50 pixels
-                current_x, current_y = pyautogui.position()
-                pyautogui.moveTo(current_x, current_y - 50)
+                current_x, current_y = win_input.get_cursor_position()
+                win_input.move_cursor(current_x, current_y - 50)
 
                 logger.info(f"Successfully submitted answer for question {question_count}")
                 
@@ -741,26 +851,40 @@ class TriviaAutomation(AutomationBase):
         try:
             self.current_question_count = current_question_num
             
-            # Wait for trivia banner to appear with retry logic
-            max_attempts = 15  # 15 seconds max wait time
+            # Poll for the trivia banner, quickly at first and backing off while it stays away
+            deadline = time.monotonic() + self.BANNER_WAIT_TIMEOUT
+            interval = self.BANNER_POLL_INTERVAL
             attempt = 0
+            previous_box = None
             
-            while attempt < max_attempts:
+            # Look for trivia banner using template matching
+            banner_criteria = self._element_criteria("TRIVIA_BANNER")
+            
+            while time.monotonic() < deadline:
                 attempt += 1
                 
-                # Look for trivia banner using template matching
-                banner_criteria = ElementSearchCriteria(
-                    name="Trivia Banner",
-                    element_type=ElementType.BUTTON,
-                    detection_methods=[DetectionMethod.TEMPLATE],
-                    confidence_threshold=AutomationConstants.TRIVIA_CONFIDENCE_THRESHOLD,
-                    template_path=config.get_trivia_template_path(AssetPaths.TriviaTemplates.TRIVIA_BANNER)
-                )
-                
-                # Try to find the trivia banner
-                banner_element = self.ui_detector.find_element(banner_criteria)
+                # Try to find the trivia banner, first near where it last was. Both
+                # searches run against the same frame, grabbed once per attempt
+                self.ui_detector.invalidate_screenshot()
+                screenshot = self.ui_detector.take_screenshot()
+                banner_element = None
+                if self._banner_nearby_criteria is not None:
+                    banner_element = self.ui_detector.find_element(self._banner_nearby_criteria, silent=True,
+                                                                   screenshot=screenshot)
+                if banner_element is None:
+                    banner_element = self.ui_detector.find_element(banner_criteria, silent=True,
+                                                                   screenshot=screenshot)
                 
                 if banner_element:
+                    # Only read once the banner sits still on two consecutive frames,
+                    # so text is not copied while the page is still animating in
+                    if banner_element.bounding_box != previous_box:
+                        previous_box = banner_element.bounding_box
+                        time.sleep(self.BANNER_CONFIRM_DELAY)
+                        continue
+                    
+                    self._remember_banner_position(banner_criteria, banner_element.bounding_box)
+                    
                     # Calculate question position (45 pixels down from banner center)
                     center = banner_element.center
                     question_x = center.x
@@ -775,21 +899,21 @@ class TriviaAutomation(AutomationBase):
                             'question_position': (center.x, question_y),
                             'question_text': question_text
                         })
-                    else:
-                        logger.warning(f"Empty question text extracted on attempt {attempt}, retrying...")
-                        time.sleep(1)
-                        continue
+                    logger.warning(f"Empty question text extracted on attempt {attempt}, retrying...")
                 else:
-                    logger.info(f"Trivia banner not found on attempt {attempt}, waiting 1 second...")
-                    time.sleep(1)
+                    previous_box = None
+                    logger.debug("Trivia banner not found on attempt %d, retrying in %.2fs", attempt, interval)
+                
+                time.sleep(interval)
+                interval = min(interval * 1.5, self.BANNER_POLL_MAX_INTERVAL)
             
-            # If we get here, banner was not found after all attempts
-            logger.warning("Could not find trivia banner after all attempts - using fallback positioning")
+            # If we get here, banner was not found before the deadline
+            logger.warning(f"Could not find trivia banner after {attempt} attempts - using fallback positioning")
             # Fallback to center screen positioning
-            screen_width, screen_height = pyautogui.size()
+            screen_width, screen_height = win_input.screen_size()
             center_x = screen_width // 2
             center_y = screen_height // 2
-            pyautogui.moveTo(center_x, center_y)
+            win_input.move_cursor(center_x, center_y)
             logger.info(f"Fallback: Moved mouse to screen center: ({center_x}, {center_y})")
             
             return ActionResult.success_result("Mouse positioned at fallback location", data={
@@ -800,6 +924,15 @@ class TriviaAutomation(AutomationBase):
             logger.error(f"Error positioning mouse for question extraction: {e}")
             return ActionResult.failure_result(f"Failed to position mouse: {e}", error=e)
     
+    def _remember_banner_position(self, banner_criteria: ElementSearchCriteria, bbox: BoundingBox):
+        """Restrict later banner searches to a margin around this hit"""
+        margin = self.BANNER_SEARCH_MARGIN
+        region = BoundingBox(max(bbox.x - margin, 0), max(bbox.y - margin, 0),
+                             bbox.width + 2 * margin, bbox.height + 2 * margin)
+        nearby = self._banner_nearby_criteria
+        if nearby is None or nearby.region != region:
+            self._banner_nearby_criteria = dataclasses.replace(banner_criteria, region=region)
+    
     def _find_answer_for_question(self, trivia_name: str, question_text: str) -> str:
         """Find the answer for a given question in the trivia database"""
         try:
@@ -807,17 +940,23 @@ class TriviaAutomation(AutomationBase):
                 logger.warning(f"Trivia {trivia_name} not found in database")
                 return None
             
-            trivia_data = self.trivia_database[trivia_name]
-            questions = trivia_data.get('questions', {})
+            questions, by_clean, word_sets = self._question_index(trivia_name)
             
             # Try exact match first
             if question_text in questions:
                 return questions[question_text]
             
-            # Try partial match (in case of slight differences)
-            for db_question, answer in questions.items():
-                # Check if the extracted question contains key parts of the database question
-                if self._questions_match(question_text, db_question):
+            # Then ignoring case, punctuation and whitespace differences
+            extracted_clean = _normalize_question(question_text)
+            if extracted_clean in by_clean:
+                logger.info(f"Normalized match found for question")
+                return by_clean[extracted_clean]
+            
+            # Try partial match: the extracted question contains at least 80% of
+            # a database question's words (useful when the copy misses some words)
+            extracted_words = set(extracted_clean.split())
+            for database_words, answer in word_sets:
+                if len(database_words.intersection(extracted_words)) / len(database_words) >= 0.8:
                     logger.info(f"Partial match found for question")
                     return answer
             
@@ -828,58 +967,52 @@ class TriviaAutomation(AutomationBase):
             logger.error(f"Error finding answer for question: {e}")
             return None
     
-    def _questions_match(self, extracted_question: str, database_question: str) -> bool:
-        """Check if two questions match (handles slight variations)"""
-        try:
-            # Convert to lowercase for comparison
-            extracted_lower = extracted_question.lower().strip()
-            database_lower = database_question.lower().strip()
-            
-            # Remove common punctuation and extra spaces
-            import re
-            extracted_clean = re.sub(r'[^\w\s]', ' ', extracted_lower)
-            database_clean = re.sub(r'[^\w\s]', ' ', database_lower)
-            
-            # Remove extra whitespace
-            extracted_clean = re.sub(r'\s+', ' ', extracted_clean).strip()
-            database_clean = re.sub(r'\s+', ' ', database_clean).strip()
-            
-            # Check if they're the same
-            if extracted_clean == database_clean:
-                return True
-            
-            # Check if extracted question contains most of the database question
-            # (useful for cases where OCR might miss some words)
-            database_words = set(database_clean.split())
-            extracted_words = set(extracted_clean.split())
-            
-            # If extracted question contains at least 80% of the database question words
-            if len(database_words) > 0:
-                match_ratio = len(database_words.intersection(extracted_words)) / len(database_words)
-                if match_ratio >= 0.8:
-                    return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error comparing questions: {e}")
-            return False
+    def _question_index(self, trivia_name: str) -> tuple:
+        """
+        Lookup tables for one trivia's questions, built on first use
+        
+        Returns (questions as stored, normalized question -> answer, list of
+        (word set, answer) for partial matching). The database itself is shared
+        with other loaders, so the tables are kept separately.
+        """
+        index = self._question_indexes.get(trivia_name)
+        if index is None:
+            questions = self.trivia_database[trivia_name].get('questions', {})
+            by_clean = {}
+            word_sets = []
+            for db_question, answer in questions.items():
+                clean = _normalize_question(db_question)
+                # Keep the first question when two normalize the same, as the old scan did
+                by_clean.setdefault(clean, answer)
+                words = set(clean.split())
+                if words:
+                    word_sets.append((words, answer))
+            index = self._question_indexes[trivia_name] = (questions, by_clean, word_sets)
+        return index
 
     def _copy_text_from_position(self, x, y):
         """Move mouse to position, triple-click, and copy text to clipboard"""
-        pyautogui.moveTo(x, y)
-        time.sleep(0.1)  # Delay after moving mouse
-        pyautogui.tripleClick()
-        time.sleep(0.1)  # Delay after selection
-        pyautogui.hotkey('ctrl', 'c')
-        time.sleep(0.1)  # Delay after copying
-        return pyperclip.paste().strip()
+        # Clear the clipboard first so a failed copy reads as empty rather than
+        # returning whatever was copied last
+        pyperclip.copy("")
+        
+        # The clicks and the copy shortcut reach the browser in order, so the
+        # selection is in place before ctrl+c without any pauses between them
+        win_input.click(x, y, clicks=3)
+        win_input.hotkey('ctrl', 'c')
+        
+        # The browser fills the clipboard asynchronously; poll briefly for it
+        deadline = time.monotonic() + self.CLIPBOARD_TIMEOUT
+        while True:
+            text = pyperclip.paste()
+            if text or time.monotonic() >= deadline:
+                return text.strip()
+            time.sleep(0.01)
 
     def _click_answer_checkbox(self, answer_x, answer_y, answer_text):
         """Click the checkbox for an answer option (30 pixels to the left of answer text)"""
         checkbox_x = answer_x - 30
-        pyautogui.moveTo(checkbox_x, answer_y)
-        pyautogui.click(checkbox_x, answer_y)
+        win_input.click(checkbox_x, answer_y)
         logger.info(f"Checked correct answer: {answer_text}")
 
     def _find_and_click_correct_answer(self, question_position, correct_answer, question_text):
@@ -956,13 +1089,12 @@ class TriviaAutomation(AutomationBase):
                 return True
             
             # Clean both answers by removing all punctuation and extra spaces
-            import re
-            extracted_clean = re.sub(r'[^\w\s]', ' ', extracted_lower)
-            correct_clean = re.sub(r'[^\w\s]', ' ', correct_lower)
+            extracted_clean = _PUNCT_RE.sub(' ', extracted_lower)
+            correct_clean = _PUNCT_RE.sub(' ', correct_lower)
             
             # Remove extra whitespace
-            extracted_clean = re.sub(r'\s+', ' ', extracted_clean).strip()
-            correct_clean = re.sub(r'\s+', ' ', correct_clean).strip()
+            extracted_clean = _WS_RE.sub(' ', extracted_clean).strip()
+            correct_clean = _WS_RE.sub(' ', correct_clean).strip()
             
             # Check if they're the same after cleaning
             if extracted_clean == correct_clean:
@@ -987,10 +1119,10 @@ class TriviaAutomation(AutomationBase):
                 return True
             
             # Clean normalized versions
-            extracted_norm_clean = re.sub(r'[^\w\s]', ' ', extracted_normalized)
-            correct_norm_clean = re.sub(r'[^\w\s]', ' ', correct_normalized)
-            extracted_norm_clean = re.sub(r'\s+', ' ', extracted_norm_clean).strip()
-            correct_norm_clean = re.sub(r'\s+', ' ', correct_norm_clean).strip()
+            extracted_norm_clean = _PUNCT_RE.sub(' ', extracted_normalized)
+            correct_norm_clean = _PUNCT_RE.sub(' ', correct_normalized)
+            extracted_norm_clean = _WS_RE.sub(' ', extracted_norm_clean).strip()
+            correct_norm_clean = _WS_RE.sub(' ', correct_norm_clean).strip()
             
             if extracted_norm_clean == correct_norm_clean:
                 return True
@@ -2,29 +2,40 @@
 Base automation class with reusable methods
 """
 import time
-import pyautogui
+import cv2
 from typing import Optional, List, Callable, Any
 from abc import ABC, abstractmethod
 
 from src.core.action_result import ActionResult, ActionResultStatus
-from src.core.element import UIElement, ElementSearchCriteria, Coordinates
+from src.core.element import UIElement, ElementSearchCriteria, Coordinates, BoundingBox
 from src.detection.ui_detector import UIDetector
+from src.utils import win_input
 from src.utils.logger import logger
+from src.utils.poll_schedule import PollSchedule
+from src.utils.screen_capture import grab_screen
 
 class AutomationBase(ABC):
     """Base class for all automation modules with reusable methods"""
     
+    # Largest mean absolute difference (grey levels, 0-255) between consecutive
+    # 64x64 thumbnails that _wait_for_visual_stability still treats as unchanged
+    STABILITY_TOLERANCE = 1.0
+    
     def __init__(self, ui_detector: UIDetector):
         self.ui_detector = ui_detector
         self.name = self.__class__.__name__
         self.initial_game_state = None  # Will be set by bot framework
         
+        # criteria name -> (element, monotonic time) from the last successful wait,
+        # so a click straight after a wait can skip detecting the element again
+        self._last_seen = {}
+        
     def find_and_click(self, criteria: ElementSearchCriteria, 
                       wait_time: float = 2.0, retries: int = 3) -> ActionResult:
         """Find an element and click on it with retries"""
         for attempt in range(retries + 1):
             try:
-                logger.debug(f"Attempting to find and click '{criteria.name}' (attempt {attempt + 1}/{retries + 1})")
+                logger.debug("Attempting to find and click '%s' (attempt %d/%d)", criteria.name, attempt + 1, retries + 1)
                 
                 # Find the element
                 element = self.ui_detector.find_element(criteria)
@@ -36,7 +47,7 @@ class AutomationBase(ABC):
                     return ActionResult.failure_result(f"Element '{criteria.name}' not found after {retries + 1} attempts")
                 
                 # Wait a moment before clicking to ensure UI is stable
-                logger.debug(f"Waiting 0.5s before clicking '{criteria.name}' to ensure UI stability...")
+                logger.debug("Waiting 0.5s before clicking '%s' to ensure UI stability...", criteria.name)
                 time.sleep(0.5)
                 
                 # Click on the element
@@ -84,11 +95,20 @@ class AutomationBase(ABC):
         return ActionResult.failure_result(f"Failed to find and type into '{criteria.name}' after all retries")
     
     def wait_for_element(self, criteria: ElementSearchCriteria, 
-                        timeout: float = 10.0, check_interval: float = 1.0) -> ActionResult:
-        """Wait for an element to appear on screen"""
+                        timeout: float = 10.0, check_interval: float = 1.0,
+                        schedule: Optional[PollSchedule] = None,
+                        backoff: float = 1.0, max_interval: Optional[float] = None) -> ActionResult:
+        """
+        Wait for an element to appear on screen
+        
+        With a schedule, checks follow the element's learned appearance times and
+        fall back to check_interval once those are exhausted. A backoff above 1.0
+        grows check_interval by that factor after each check, up to max_interval,
+        for long waits that do not need a quick reaction.
+        """
         start_time = time.time()
         attempts = 0
-        
+        max_interval = check_interval if max_interval is None else max(max_interval, check_interval)
         
         while time.time() - start_time < timeout:
             attempts += 1
@@ -96,22 +116,100 @@ class AutomationBase(ABC):
                 element = self.ui_detector.find_element(criteria, silent=True)
                 if element:
                     wait_time = time.time() - start_time
+                    if schedule is not None:
+                        schedule.record(wait_time)
+                    self._last_seen[criteria.name] = (element, time.monotonic())
                     return ActionResult.success_result(
                         f"Element '{criteria.name}' found",
                         data={"element": element, "wait_time": wait_time, "attempts": attempts}
                     )
                 
-                
-                time.sleep(check_interval)
+                elapsed = time.time() - start_time
+                delay = schedule.next_delay(elapsed, check_interval) if schedule is not None else check_interval
+                # Never sleep past the timeout
+                time.sleep(max(min(delay, timeout - elapsed), 0))
+                check_interval = min(check_interval * backoff, max_interval)
                 
             except Exception as e:
-                logger.debug(f"Error checking for element '{criteria.name}' (attempt {attempts}): {e}")
-                time.sleep(check_interval)
+                logger.debug("Error checking for element '%s' (attempt %d): %s", criteria.name, attempts, e)
+                time.sleep(max(min(check_interval, timeout - (time.time() - start_time)), 0))
         
         elapsed = time.time() - start_time
         logger.warning(f"Element '{criteria.name}' not found within {timeout}s timeout ({attempts} attempts)")
         return ActionResult.failure_result(f"Element '{criteria.name}' not found within {timeout}s timeout")
     
+    def wait_for_any_element(self, criteria_list: List[ElementSearchCriteria],
+                             timeout: float = 10.0, check_interval: float = 1.0,
+                             schedule: Optional[PollSchedule] = None) -> ActionResult:
+        """
+        Wait for whichever of several elements appears first
+        
+        Every check captures one screenshot and matches all criteria against it.
+        Ties go to the earlier criteria in the list; the one found is returned
+        in the result data as "element".
+        """
+        start_time = time.time()
+        attempts = 0
+        names = [criteria.name for criteria in criteria_list]
+        
+        while time.time() - start_time < timeout:
+            attempts += 1
+            try:
+                found = self.ui_detector.detect_many(criteria_list)
+                for name in names:
+                    element = found[name]
+                    if element:
+                        wait_time = time.time() - start_time
+                        if schedule is not None:
+                            schedule.record(wait_time)
+                        self._last_seen[name] = (element, time.monotonic())
+                        return ActionResult.success_result(
+                            f"Element '{name}' found",
+                            data={"element": element, "wait_time": wait_time, "attempts": attempts}
+                        )
+                
+                elapsed = time.time() - start_time
+                delay = schedule.next_delay(elapsed, check_interval) if schedule is not None else check_interval
+                # Never sleep past the timeout
+                time.sleep(max(min(delay, timeout - elapsed), 0))
+                
+            except Exception as e:
+                logger.debug("Error checking for elements %s (attempt %d): %s", names, attempts, e)
+                time.sleep(max(min(check_interval, timeout - (time.time() - start_time)), 0))
+        
+        logger.warning(f"None of {names} found within {timeout}s timeout ({attempts} attempts)")
+        return ActionResult.failure_result(f"None of {names} found within {timeout}s timeout")
+    
+    def click_waited_element(self, wait_result: ActionResult, criteria: ElementSearchCriteria,
+                             settle_time: float = 0.5) -> ActionResult:
+        """
+        Click the element a successful wait_for_element already located, without
+        detecting it again; falls back to find_and_click if that click fails
+        """
+        element = wait_result.data.get("element") if wait_result.data else None
+        if element is not None:
+            # Same UI-stability pause find_and_click makes before clicking
+            time.sleep(settle_time)
+            click_result = self.click_element(element)
+            if click_result.success:
+                return click_result
+            logger.warning(f"Click on located '{criteria.name}' failed, re-detecting...")
+        
+        # The element was just confirmed on screen, so one immediate retry is
+        # enough; a caller that needs more re-enters through wait_for_element
+        return self.find_and_click(criteria, wait_time=0.0, retries=1)
+    
+    def click_last_seen(self, criteria: ElementSearchCriteria, max_age: float = 0.5) -> ActionResult:
+        """
+        Click where wait_for_element last saw the element if that was within
+        max_age seconds; otherwise detect it again through find_and_click
+        """
+        last_seen = self._last_seen.pop(criteria.name, None)
+        if last_seen is not None and time.monotonic() - last_seen[1] <= max_age:
+            return self.click_element(last_seen[0])
+        
+        return self.find_and_click(criteria, wait_time=1.0, retries=3)
+    
     def wait_for_element_to_disappear(self, criteria: ElementSearchCriteria, 
                                     timeout: float = 10.0, check_interval: float = 1.0) -> ActionResult:
         """Wait for an element to disappear from screen"""
@@ -130,7 +228,7 @@ class AutomationBase(ABC):
                 time.sleep(check_interval)
                 
             except Exception as e:
-                logger.debug(f"Error checking for element '{criteria.name}': {e}")
+                logger.debug("Error checking for element '%s': %s", criteria.name, e)
                 time.sleep(check_interval)
         
         return ActionResult.failure_result(f"Element '{criteria.name}' still present after {timeout}s timeout")
@@ -138,18 +236,19 @@ class AutomationBase(ABC):
     def click_element(self, element: UIElement) -> ActionResult:
         """Click on a UI element"""
         try:
-            logger.debug(f"Clicking on '{element.name}' at {element.center}")
-            logger.debug(f"Element bounding box: {element.bounding_box}")
-            logger.debug(f"Detection method: {element.detection_method}")
-            logger.debug(f"Confidence: {element.confidence:.3f}")
+            logger.debug("Clicking on '%s' at %s", element.name, element.center)
+            logger.debug("Element bounding box: %s", element.bounding_box)
+            logger.debug("Detection method: %s", element.detection_method)
+            logger.debug("Confidence: %.3f", element.confidence)
             
             # Move mouse to element and click
-            pyautogui.moveTo(element.center.x, element.center.y)
+            win_input.move_cursor(element.center.x, element.center.y)
             time.sleep(0.2)  # Small delay for visual feedback and UI stability
             
             # Perform the click
-            pyautogui.click()
-            logger.debug(f"Click performed at ({element.center.x}, {element.center.y})")
+            win_input.click(element.center.x, element.center.y)
+            self.ui_detector.invalidate_screenshot()
+            logger.debug("Click performed at (%d, %d)", element.center.x, element.center.y)
             
             return ActionResult.success_result(
                 f"Successfully clicked '{element.name}'",
@@ -166,14 +265,14 @@ class AutomationBase(ABC):
             logger.info(f"Typing into '{element.name}' at {element.center}")
             
             # Click on the element first to focus it
-            pyautogui.moveTo(element.center.x, element.center.y)
-            pyautogui.click()
+            win_input.click(element.center.x, element.center.y)
             time.sleep(0.2)
             
             # Clear the field and type new text
-            pyautogui.hotkey('ctrl', 'a')
+            win_input.hotkey('ctrl', 'a')
             time.sleep(0.1)
-            pyautogui.typewrite(text, interval=0.05)
+            win_input.type_text(text)
+            self.ui_detector.invalidate_screenshot()
             
             return ActionResult.success_result(
                 f"Successfully typed into '{element.name}'",
@@ -201,11 +300,46 @@ class AutomationBase(ABC):
                 time.sleep(check_interval)
                 
             except Exception as e:
-                logger.debug(f"Error checking condition '{condition_name}': {e}")
+                logger.debug("Error checking condition '%s': %s", condition_name, e)
                 time.sleep(check_interval)
         
         return ActionResult.failure_result(f"Condition '{condition_name}' not met within {timeout}s timeout")
     
+    def _wait_for_visual_stability(self, region: Optional[BoundingBox] = None,
+                                   max_wait: float = 5.0, interval: float = 0.2) -> bool:
+        """
+        Wait until two consecutive frames look the same
+        
+        Frames are downscaled to 64x64 grayscale thumbnails and compared by mean
+        absolute difference, so changes averaging no more than
+        STABILITY_TOLERANCE grey levels over the thumbnail (a blinking caret,
+        compression noise) count as stable. Anything larger, such as a menu
+        still sliding in, counts as a change.
+        
+        Args:
+            region: Optional region to watch instead of the full screen
+            max_wait: Maximum time to wait in seconds
+            interval: Time between captures in seconds
+            
+        Returns:
+            True once the screen was stable, False if it kept changing until max_wait
+        """
+        deadline = time.monotonic() + max_wait
+        previous = None
+        while True:
+            frame = grab_screen(region)
+            if frame is None:
+                return False
+            thumbnail = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (64, 64),
+                                   interpolation=cv2.INTER_AREA)
+            if previous is not None and \
+                    cv2.norm(thumbnail, previous, cv2.NORM_L1) / thumbnail.size <= self.STABILITY_TOLERANCE:
+                return True
+            previous = thumbnail
+            if time.monotonic() + interval > deadline:
+                return False
+            time.sleep(interval)
+    
     def execute_with_retry(self, action_func: Callable[[], ActionResult], 
                           max_retries: int = 3, retry_delay: float = 2.0) -> ActionResult:
         """Execute an action with automatic retries"""
@@ -100,6 +100,8 @@ class ElementSearchCriteria:
     detection_methods: List[DetectionMethod] = None
     region: Optional[BoundingBox] = None  # Search only in this region
     metadata: Optional[dict] = None  # Additional metadata
+    grayscale: bool = False  # Template-match on luminance only
+    scale_steps: Optional[List[float]] = None  # Downscaled pyramid passes run before the full-size match
     
     def __post_init__(self):
         if self.detection_methods is None:
@@ -9,6 +9,7 @@ import pytesseract
 from src.core.element import UIElement, ElementSearchCriteria, ElementType, DetectionMethod, BoundingBox, Coordinates
 # from src.utils.screenshot import ScreenshotManager  # Disabled for GitHub
 from src.utils.logger import logger
+from src.utils.screen_capture import grab_screen
 
 class OCRDetector:
     """OCR-based text detection for UI elements"""
@@ -39,9 +40,7 @@ class OCRDetector:
         
         try:
             # Take current screenshot (directly)
-            import pyautogui
-            screenshot = pyautogui.screenshot()
-            screenshot = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            screenshot = grab_screen()
             if screenshot is None:
                 logger.error("Failed to take screenshot for OCR detection")
                 return None
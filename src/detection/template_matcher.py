@@ -4,7 +4,8 @@ Template matching detection module
 import cv2
 import numpy as np
 import time
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, List, Tuple
 from pathlib import Path
 
 from src.core.element import UIElement, ElementSearchCriteria, ElementType, DetectionMethod, BoundingBox
@@ -12,16 +13,46 @@ from src.core.action_result import ActionResult
 # from src.utils.screenshot import ScreenshotManager  # Disabled for GitHub
 from config import config
 from src.utils.logger import logger
+from src.utils.screen_capture import grab_screen
+
+@dataclass
+class TemplateBatch:
+    """
+    Several templates laid out as parallel arrays for matching against one frame.
+    
+    Index i of every field describes the same template; order is priority order.
+    """
+    criteria: List[ElementSearchCriteria]
+    templates: List[np.ndarray]  # Zero-mean unit-norm float32 templates
+    sizes: List[Tuple[int, int]]  # (width, height) of each template
+    thresholds: np.ndarray  # float32 confidence thresholds
 
 class TemplateMatcher:
     """Template matching for UI element detection"""
     
+    # A downscaled pyramid pass must score within this margin of the confidence
+    # threshold before the full-resolution match is attempted
+    PYRAMID_GATE_MARGIN = 0.15
+    
+    # Extra full-resolution pixels searched on each side of the coarse hit; covers
+    # the position error of a downscaled match with room to spare
+    PYRAMID_REFINE_PADDING = 8
+    
     def __init__(self):
         # self.screenshot_manager = ScreenshotManager()  # Disabled for GitHub
         self.confidence_threshold = 0.8
+        self._histogram_cache = {}  # template path -> normalized 16-bin grayscale histogram
+        self._template_cache = {}  # (path, grayscale, scale) -> (template, zero-mean unit-norm float32 template)
+        self._gray_frame = (None, None)  # (source screenshot, its grayscale conversion)
+        self._stats_frame = (None, None)  # (source screenshot, its _frame_stats)
         
-    def find_element(self, criteria: ElementSearchCriteria) -> Optional[UIElement]:
-        """Find an element using template matching"""
+    def capture_screen(self) -> Optional[np.ndarray]:
+        """Take a full-screen screenshot as a BGR OpenCV image"""
+        return grab_screen()
+    
+    def find_element(self, criteria: ElementSearchCriteria,
+                     screenshot: Optional[np.ndarray] = None) -> Optional[UIElement]:
+        """Find an element using template matching, optionally against a pre-captured screenshot"""
         if not criteria.template_path:
             logger.debug(f"No template path provided for '{criteria.name}'")
             return None
@@ -33,16 +64,16 @@ class TemplateMatcher:
                 logger.warning(f"Template file not found: {template_path}")
                 return None
             
-            # Take current screenshot (directly)
-            import pyautogui
-            screenshot = pyautogui.screenshot()
-            screenshot = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            # Take current screenshot unless the caller already captured one
+            if screenshot is None:
+                screenshot = self.capture_screen()
             if screenshot is None:
                 logger.error("Failed to take screenshot for template matching")
                 return None
             
             # Perform template matching
-            match_result = self._match_template(screenshot, template_path, criteria.confidence_threshold)
+            match_result = self._match_template(screenshot, template_path, criteria.confidence_threshold,
+                                                criteria.region, criteria.grayscale, criteria.scale_steps)
             
             if match_result:
                 x, y, width, height, confidence = match_result
@@ -67,25 +98,216 @@ class TemplateMatcher:
             logger.error(f"Template matching failed for '{criteria.name}': {e}")
             return None
     
-    def _match_template(self, screenshot: np.ndarray, template_path: Path, min_confidence: float) -> Optional[tuple]:
-        """Perform template matching and return match result"""
+    def best_score(self, criteria: ElementSearchCriteria, screenshot: Optional[np.ndarray] = None) -> float:
+        """Best TM_CCOEFF_NORMED score for the criteria template, independent of its threshold"""
+        if not criteria.template_path or not Path(criteria.template_path).exists():
+            return 0.0
+        
+        if screenshot is None:
+            screenshot = self.capture_screen()
+        if screenshot is None:
+            return 0.0
+        
+        # No pyramid gate here: the caller wants the score itself, not a yes/no
+        match_result = self._match_template(screenshot, Path(criteria.template_path), -1.0,
+                                            criteria.region, criteria.grayscale)
+        return match_result[4] if match_result else 0.0
+    
+    def _load_template(self, template_path: Path, grayscale: bool = False,
+                       scale: float = 1.0) -> Optional[tuple]:
+        """Load a template once and cache it alongside its pre-normalized float32 form"""
+        key = (str(template_path), grayscale, scale)
+        cached = self._template_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if scale != 1.0:
+            base = self._load_template(template_path, grayscale)
+            if base is None:
+                return None
+            template = cv2.resize(base[0], None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+            template = cv2.imread(str(template_path), flags)
+            if template is None:
+                return None
+        
+        # Subtract the per-channel mean and scale to unit norm so the template
+        # side of TM_CCOEFF_NORMED never has to be recomputed per match
+        template_norm = template.astype(np.float32)
+        template_norm -= template_norm.mean(axis=(0, 1))
+        template_norm /= np.linalg.norm(template_norm) + 1e-9
+        
+        cached = (template, template_norm)
+        self._template_cache[key] = cached
+        return cached
+    
+    def preload(self, criteria_list: list) -> int:
+        """Decode and normalize the templates for the given criteria ahead of the first match"""
+        loaded = 0
+        for criteria in criteria_list:
+            if not criteria.template_path:
+                continue
+            if self._load_template(criteria.template_path, criteria.grayscale) is None:
+                logger.warning(f"Failed to preload template: {criteria.template_path}")
+                continue
+            for scale in criteria.scale_steps or []:
+                if scale < 1.0:
+                    self._load_template(criteria.template_path, criteria.grayscale, scale)
+            if criteria.region is not None:
+                self._template_histogram(criteria.template_path)
+            loaded += 1
+        return loaded
+    
+    def prepare_batch(self, criteria_list: List[ElementSearchCriteria]) -> Optional[TemplateBatch]:
+        """
+        Lay out full-frame color templates for match_batch. Returns None if any
+        criteria needs a region, grayscale or pyramid pass, or its template is missing.
+        """
+        templates, sizes, thresholds = [], [], []
+        for criteria in criteria_list:
+            if not criteria.template_path or criteria.region is not None or \
+                    criteria.grayscale or criteria.scale_steps:
+                return None
+            loaded = self._load_template(criteria.template_path)
+            if loaded is None:
+                return None
+            template, template_norm = loaded
+            templates.append(template_norm)
+            sizes.append((template.shape[1], template.shape[0]))
+            thresholds.append(criteria.confidence_threshold)
+        
+        return TemplateBatch(list(criteria_list), templates, sizes, np.array(thresholds, dtype=np.float32))
+    
+    def match_batch(self, screenshot: np.ndarray, batch: TemplateBatch,
+                    executor=None) -> Tuple[int, float, Optional[Tuple[int, int]]]:
+        """
+        Match every template in the batch against one frame, sharing the frame
+        conversion and integral images. Returns (index, score, top-left) for the
+        first template in batch order that clears its threshold, or (-1, 0.0, None).
+        """
+        frame_stats = self._frame_stats(screenshot)
+        
+        def best(template_norm):
+            _, max_val, _, max_loc = cv2.minMaxLoc(self._ccoeff_normed(screenshot, template_norm, frame_stats))
+            return max_val, max_loc
+        
+        mapper = executor.map if executor is not None else map
+        results = list(mapper(best, batch.templates))
+        scores = np.array([score for score, _ in results], dtype=np.float32)
+        
+        hits = np.flatnonzero(scores >= batch.thresholds)
+        if hits.size == 0:
+            return -1, 0.0, None
+        index = int(hits[0])
+        return index, float(scores[index]), results[index][1]
+    
+    def _grayscale(self, screenshot: np.ndarray) -> np.ndarray:
+        """Convert a screenshot to grayscale, reusing the result for repeated calls on the same frame"""
+        source, gray = self._gray_frame
+        if source is not screenshot:
+            gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+            self._gray_frame = (screenshot, gray)
+        return gray
+    
+    def _frame_stats(self, screenshot: np.ndarray) -> tuple:
+        """
+        Template-independent parts of a batch match: the float32 frame and its
+        integral images, reused for repeated calls on the same frame
+        """
+        source, stats = self._stats_frame
+        if source is not screenshot:
+            sums, sqsums = cv2.integral2(screenshot, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+            stats = (screenshot.astype(np.float32), sums, sqsums)
+            self._stats_frame = (screenshot, stats)
+        return stats
+    
+    def _ccoeff_normed(self, screenshot: np.ndarray, template_norm: np.ndarray,
+                       frame_stats: Optional[tuple] = None) -> np.ndarray:
+        """
+        Equivalent of cv2.TM_CCOEFF_NORMED using a pre-normalized template.
+        
+        Because the template is zero-mean, plain TM_CCORR yields the centered
+        correlation directly; the image-side norm of each window comes from
+        integral images of the screenshot and its square. Only worth it when
+        several templates share one frame's _frame_stats (match_batch); a single
+        match is no faster than the native method, which _match_template uses.
+        """
+        h, w = template_norm.shape[:2]
+        frame, sums, sqsums = frame_stats or self._frame_stats(screenshot)
+        numerator = cv2.matchTemplate(frame, template_norm, cv2.TM_CCORR)
+        
+        window_sum = sums[h:, w:] - sums[:-h, w:] - sums[h:, :-w] + sums[:-h, :-w]
+        window_sqsum = sqsums[h:, w:] - sqsums[:-h, w:] - sqsums[h:, :-w] + sqsums[:-h, :-w]
+        
+        variance = window_sqsum - window_sum * window_sum / (h * w)
+        if variance.ndim == 3:
+            variance = variance.sum(axis=2)
+        denominator = np.sqrt(np.maximum(variance, 0.0))
+        
+        # Flat windows have no defined correlation; treat them as non-matches
+        result = np.zeros_like(numerator)
+        np.divide(numerator, denominator, out=result, where=denominator > 1e-6)
+        return result
+    
+    def _match_template(self, screenshot: np.ndarray, template_path: Path, min_confidence: float,
+                        region: Optional[BoundingBox] = None, grayscale: bool = False,
+                        scale_steps: Optional[list] = None) -> Optional[tuple]:
+        """Perform template matching (restricted to region if given) and return match result"""
         try:
             # Load template
-            template = cv2.imread(str(template_path))
-            if template is None:
+            loaded = self._load_template(template_path, grayscale)
+            if loaded is None:
                 logger.error(f"Failed to load template: {template_path}")
                 return None
+            template, template_norm = loaded
+            h, w = template.shape[:2]
             
-            # Perform template matching
-            result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            if grayscale:
+                screenshot = self._grayscale(screenshot)
+            
+            # Crop to the search region; fall back to the full frame if the
+            # region is off-screen or too small to hold the template
+            offset_x, offset_y = 0, 0
+            if region is not None:
+                x0, y0 = max(region.x, 0), max(region.y, 0)
+                x1 = min(region.x + region.width, screenshot.shape[1])
+                y1 = min(region.y + region.height, screenshot.shape[0])
+                if x1 - x0 >= w and y1 - y0 >= h:
+                    screenshot = screenshot[y0:y1, x0:x1]
+                    offset_x, offset_y = x0, y0
+            
+            # Coarse-to-fine: each downscaled pass, smallest first, must come close
+            # to the threshold or the full-resolution match is skipped entirely
+            coarse_hit = None
+            for scale in sorted(step for step in (scale_steps or []) if step < 1.0):
+                passed, coarse_hit = self._pyramid_gate(screenshot, template_path, grayscale, scale, min_confidence)
+                if not passed:
+                    logger.debug("Template rejected at %sx pyramid pass", scale)
+                    return None
             
-            logger.debug(f"Template matching confidence: {max_val:.3f}")
+            # Refine in a small window around the finest coarse hit, then fall
+            # back to the whole frame in case the coarse peak was a decoy
+            max_val, max_loc = -1.0, None
+            if coarse_hit is not None:
+                (hit_x, hit_y), scale = coarse_hit
+                pad = int(np.ceil(1.0 / scale)) + self.PYRAMID_REFINE_PADDING
+                wx0 = max(int(hit_x / scale) - pad, 0)
+                wy0 = max(int(hit_y / scale) - pad, 0)
+                window = screenshot[wy0:int(hit_y / scale) + h + pad, wx0:int(hit_x / scale) + w + pad]
+                if window.shape[0] >= h and window.shape[1] >= w:
+                    max_val, max_loc = cv2.minMaxLoc(cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED))[1::2]
+                    max_loc = (max_loc[0] + wx0, max_loc[1] + wy0)
+            
+            if max_val < min_confidence:
+                result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
+                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            
+            logger.debug("Template matching confidence: %.3f", max_val)
             
             if max_val >= min_confidence:
-                h, w = template.shape[:2]
                 x, y = max_loc
-                return (x, y, w, h, max_val)
+                return (x + offset_x, y + offset_y, w, h, max_val)
             
             return None
             
@@ -93,6 +315,74 @@ class TemplateMatcher:
             logger.error(f"Template matching error: {e}")
             return None
     
+    def _pyramid_gate(self, screenshot: np.ndarray, template_path: Path, grayscale: bool,
+                      scale: float, min_confidence: float) -> Tuple[bool, Optional[tuple]]:
+        """
+        Run a downscaled match and report whether it scores close enough to be worth
+        refining, plus ((x, y), scale) of the coarse peak when the pass could run
+        """
+        loaded = self._load_template(template_path, grayscale, scale)
+        if loaded is None:
+            return True, None
+        template = loaded[0]
+        
+        small = cv2.resize(screenshot, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        if small.shape[0] < template.shape[0] or small.shape[1] < template.shape[1]:
+            return True, None
+        
+        _, max_val, _, max_loc = cv2.minMaxLoc(cv2.matchTemplate(small, template, cv2.TM_CCOEFF_NORMED))
+        return max_val >= min_confidence - self.PYRAMID_GATE_MARGIN, (max_loc, scale)
+    
+    def is_clearly_absent(self, criteria: ElementSearchCriteria, screenshot: np.ndarray,
+                          max_distance: float = 0.7, region: Optional[BoundingBox] = None) -> bool:
+        """
+        Cheap negative pre-check: compare 16-bin grayscale histograms of the template
+        and the search region. A Bhattacharyya distance above max_distance means the
+        region cannot contain the template, so the full matchTemplate can be skipped.
+        
+        Only applies with a region (the criteria's own unless one is passed); over
+        the full screen the histogram is dominated by unrelated pixels and would
+        reject real matches. The region is clipped to the frame.
+        """
+        region = region or criteria.region
+        if not criteria.template_path or region is None:
+            return False
+        
+        try:
+            hist_ref = self._template_histogram(criteria.template_path)
+            if hist_ref is None:
+                return False
+            
+            frame_height, frame_width = screenshot.shape[:2]
+            x0, y0 = max(region.x, 0), max(region.y, 0)
+            x1 = min(region.x + region.width, frame_width)
+            y1 = min(region.y + region.height, frame_height)
+            if x1 <= x0 or y1 <= y0:
+                return False
+            roi = screenshot[y0:y1, x0:x1]
+            roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+            hist_cur = cv2.calcHist([roi_gray], [0], None, [16], [0, 256])
+            cv2.normalize(hist_cur, hist_cur)
+            
+            distance = cv2.compareHist(hist_ref, hist_cur, cv2.HISTCMP_BHATTACHARYYA)
+            return distance > max_distance
+            
+        except Exception as e:
+            logger.debug(f"Histogram pre-check failed for '{criteria.name}': {e}")
+            return False
+    
+    def _template_histogram(self, template_path: str) -> Optional[np.ndarray]:
+        """Get the cached normalized 16-bin grayscale histogram of a template"""
+        hist_ref = self._histogram_cache.get(template_path)
+        if hist_ref is None:
+            template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                return None
+            hist_ref = cv2.calcHist([template], [0], None, [16], [0, 256])
+            cv2.normalize(hist_ref, hist_ref)
+            self._histogram_cache[template_path] = hist_ref
+        return hist_ref
+    
     def _save_match_debug(self, screenshot: np.ndarray, match_result: tuple, element_name: str):
         """Save debug image with match highlighted (disabled)"""
         # Screenshot saving disabled for GitHub repository
@@ -1,8 +1,13 @@
 """
 Main UI detection orchestrator
 """
-from typing import Optional, List
-from src.core.element import UIElement, ElementSearchCriteria, DetectionMethod
+import hashlib
+import logging
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict
+from src.core.element import UIElement, ElementSearchCriteria, DetectionMethod, BoundingBox
 from src.detection.template_matcher import TemplateMatcher
 from src.detection.visual_detector import VisualDetector
 from src.detection.ocr_detector import OCRDetector
@@ -11,6 +16,17 @@ from src.utils.logger import logger
 class UIDetector:
     """Main UI detection orchestrator that tries multiple detection methods"""
     
+    # Frames younger than this (seconds) are reused instead of grabbing again
+    SCREENSHOT_MAX_AGE = 0.05
+    
+    # Pixels added on each side of an element's last match box when it stands in
+    # for a search region; covers small shifts without letting the background
+    # dominate the histogram of small templates
+    LAST_SEEN_MARGIN = 8
+    
+    # Methods whose result depends only on the frame passed in
+    _FRAME_DETERMINISTIC = (DetectionMethod.TEMPLATE, DetectionMethod.VISUAL)
+    
     def __init__(self):
         self.template_matcher = TemplateMatcher()
         self.visual_detector = VisualDetector()
@@ -23,26 +39,101 @@ class UIDetector:
             DetectionMethod.OCR,
             DetectionMethod.COORDINATES
         ]
+        
+        # Shared pool for matching several templates against one frame; OpenCV
+        # releases the GIL inside matchTemplate so these run truly in parallel
+        self._match_executor = ThreadPoolExecutor(max_workers=2)
+        
+        # criteria key -> (frame digest, present) from the last presence check
+        self._presence_cache = {}
+        
+        # criteria key -> (frame digest, element or None) from the last find_element
+        # on a frame, so polls of an unchanged screen skip matching entirely
+        self._detect_cache = {}
+        
+        # template path -> bounding box of its last match; stands in for a search
+        # region in fast-negative presence checks of fixed elements
+        self._last_seen_box = {}
+        
+        # (frame, digest) for the last frame hashed; shared frames are hashed once
+        self._last_digest = (None, None)
+        
+        # tuple of criteria keys -> prepared TemplateBatch (None if not batchable)
+        self._batches = {}
+        
+        # (monotonic capture time, frame) of the last grab, shared by detector
+        # calls that land within SCREENSHOT_MAX_AGE of each other
+        self._last_frame = (0.0, None)
     
-    def find_element(self, criteria: ElementSearchCriteria, silent: bool = False) -> Optional[UIElement]:
+    def take_screenshot(self) -> Optional[np.ndarray]:
+        """Capture the screen once so several detections can share the same frame"""
+        captured_at, frame = self._last_frame
+        now = time.monotonic()
+        if frame is not None and now - captured_at < self.SCREENSHOT_MAX_AGE:
+            return frame
+        
+        frame = self.template_matcher.capture_screen()
+        self._last_frame = (now, frame)
+        return frame
+    
+    def invalidate_screenshot(self):
+        """Forget the shared frame; call after any input so the next check sees its effect"""
+        self._last_frame = (0.0, None)
+    
+    def preload_templates(self, criteria_list: List[ElementSearchCriteria]) -> int:
+        """Warm the template cache so the first poll does not pay for PNG decoding"""
+        return self.template_matcher.preload(criteria_list)
+    
+    def find_element(self, criteria: ElementSearchCriteria, silent: bool = False,
+                     screenshot: Optional[np.ndarray] = None) -> Optional[UIElement]:
         """Find a UI element using the best available detection method"""
-        logger.debug(f"Searching for element '{criteria.name}' using methods: {[m.value for m in criteria.detection_methods]}")
+        # Called on every poll tick: keep debug logging lazy so nothing is formatted at INFO
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Searching for element '%s' using methods: %s",
+                         criteria.name, [m.value for m in criteria.detection_methods])
+        
+        # Template and visual detection can share one (possibly recent) frame
+        if screenshot is None and (DetectionMethod.TEMPLATE in criteria.detection_methods or
+                                   DetectionMethod.VISUAL in criteria.detection_methods):
+            screenshot = self.take_screenshot()
         
+        # Template and visual detection are deterministic for a given frame, so an
+        # unchanged screen gives the same answer as last time
+        if screenshot is not None and all(m in self._FRAME_DETERMINISTIC for m in criteria.detection_methods):
+            key = self._criteria_key(criteria)
+            digest = self._frame_digest(screenshot)
+            cached = self._detect_cache.get(key)
+            if cached is not None and cached[0] == digest:
+                element = cached[1]
+            else:
+                element = self._detect(criteria, screenshot)
+                self._detect_cache[key] = (digest, element)
+        else:
+            element = self._detect(criteria, screenshot)
+        
+        if element is not None and element.detection_method == DetectionMethod.TEMPLATE:
+            self._last_seen_box[criteria.template_path] = element.bounding_box
+        
+        if element is None and not silent:
+            logger.warning(f"Could not find element '{criteria.name}' using any available method")
+        return element
+    
+    def _detect(self, criteria: ElementSearchCriteria, screenshot: Optional[np.ndarray]) -> Optional[UIElement]:
+        """Run the criteria's detection methods in order and return the first confident hit"""
         # Try each detection method in order of preference
         for method in criteria.detection_methods:
             try:
-                element = self._try_detection_method(criteria, method)
+                element = self._try_detection_method(criteria, method, screenshot)
                 if element and element.confidence >= criteria.confidence_threshold:
                     return element
                 elif element:
-                    logger.debug(f"Found '{criteria.name}' using {method.value} but confidence {element.confidence:.3f} below threshold {criteria.confidence_threshold}")
+                    logger.debug("Found '%s' using %s but confidence %.3f below threshold %s",
+                                 criteria.name, method.value, element.confidence, criteria.confidence_threshold)
                     
             except Exception as e:
-                logger.debug(f"Detection method {method.value} failed for '{criteria.name}': {e}")
+                logger.debug("Detection method %s failed for '%s': %s", method.value, criteria.name, e)
                 continue
         
-        if not silent:
-            logger.warning(f"Could not find element '{criteria.name}' using any available method")
         return None
     
     def find_elements(self, criteria_list: List[ElementSearchCriteria]) -> List[UIElement]:
@@ -57,12 +148,75 @@ class UIDetector:
         logger.info(f"Found {len(elements)}/{len(criteria_list)} elements")
         return elements
     
-    def _try_detection_method(self, criteria: ElementSearchCriteria, method: DetectionMethod) -> Optional[UIElement]:
+    def detect_many(self, criteria_list: List[ElementSearchCriteria],
+                    screenshot: Optional[np.ndarray] = None) -> Dict[str, Optional[UIElement]]:
+        """Find several elements against one shared screenshot, keyed by criteria name"""
+        if screenshot is None:
+            screenshot = self.take_screenshot()
+        if screenshot is None:
+            return {criteria.name: None for criteria in criteria_list}
+        
+        elements = self._match_executor.map(
+            lambda criteria: self.find_element(criteria, silent=True, screenshot=screenshot),
+            criteria_list
+        )
+        return {criteria.name: element for criteria, element in zip(criteria_list, elements)}
+    
+    def classify_one_of(self, criteria_list: List[ElementSearchCriteria],
+                        screenshot: Optional[np.ndarray] = None) -> Optional[UIElement]:
+        """
+        Determine which of several mutually exclusive elements is on screen.
+        
+        Grabs one screenshot and template-matches every criteria against it in
+        parallel. Returns the element for the first criteria (in list order) that
+        matched above its threshold, or None if none did. Plain full-frame
+        criteria are matched as a prepared TemplateBatch that shares the
+        per-frame work; others fall back to one find_element each.
+        """
+        if screenshot is None:
+            screenshot = self.take_screenshot()
+        if screenshot is None:
+            return None
+        
+        key = tuple((c.name, c.template_path, c.confidence_threshold) for c in criteria_list)
+        if key not in self._batches:
+            self._batches[key] = self.template_matcher.prepare_batch(criteria_list)
+        batch = self._batches[key]
+        
+        if batch is not None:
+            index, score, location = self.template_matcher.match_batch(screenshot, batch, self._match_executor)
+            if index < 0:
+                return None
+            criteria = batch.criteria[index]
+            width, height = batch.sizes[index]
+            return UIElement(
+                name=criteria.name,
+                element_type=criteria.element_type,
+                detection_method=DetectionMethod.TEMPLATE,
+                confidence=score,
+                bounding_box=BoundingBox(location[0], location[1], width, height),
+                template_path=criteria.template_path,
+                metadata=criteria.metadata
+            )
+        
+        elements = list(self._match_executor.map(
+            lambda criteria: self.template_matcher.find_element(criteria, screenshot),
+            criteria_list
+        ))
+        
+        for criteria, element in zip(criteria_list, elements):
+            if element and element.confidence >= criteria.confidence_threshold:
+                return element
+        
+        return None
+    
+    def _try_detection_method(self, criteria: ElementSearchCriteria, method: DetectionMethod,
+                              screenshot: Optional[np.ndarray] = None) -> Optional[UIElement]:
         """Try a specific detection method"""
         if method == DetectionMethod.TEMPLATE:
-            return self.template_matcher.find_element(criteria)
+            return self.template_matcher.find_element(criteria, screenshot)
         elif method == DetectionMethod.VISUAL:
-            return self.visual_detector.find_element(criteria)
+            return self.visual_detector.find_element(criteria, screenshot)
         elif method == DetectionMethod.OCR:
             return self.ocr_detector.find_element(criteria)
         elif method == DetectionMethod.COORDINATES:
@@ -83,8 +237,73 @@ class UIDetector:
         
         return None
     
-    def is_element_present(self, criteria: ElementSearchCriteria) -> bool:
-        """Check if an element is present without returning the full element"""
-        element = self.find_element(criteria, silent=True)
-        return element is not None and element.confidence >= criteria.confidence_threshold
-
+    def is_element_present(self, criteria: ElementSearchCriteria, fast_negative: bool = False) -> bool:
+        """
+        Check if an element is present without returning the full element
+        
+        With fast_negative, a histogram pre-check over the criteria region rejects
+        frames that clearly cannot contain the template before running matchTemplate.
+        Without a configured region the element's last template-match box, padded
+        by LAST_SEEN_MARGIN, is used, so fast_negative suits elements that stay in
+        one place on screen.
+        
+        Detection is deterministic for a given frame, so when the frame is
+        byte-identical to the previous check's for the same criteria (e.g. a
+        static loading screen) the previous answer is returned without matching.
+        Only answers from an actual match are remembered; a histogram rejection
+        is a heuristic and must not answer a later exact check.
+        """
+        screenshot = self.take_screenshot()
+        if screenshot is None:
+            element = self.find_element(criteria, silent=True)
+            return element is not None and element.confidence >= criteria.confidence_threshold
+        
+        key = self._criteria_key(criteria)
+        digest = self._frame_digest(screenshot)
+        cached = self._presence_cache.get(key)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        
+        if fast_negative:
+            region = criteria.region
+            if region is None:
+                box = self._last_seen_box.get(criteria.template_path)
+                if box is not None:
+                    margin = self.LAST_SEEN_MARGIN
+                    region = BoundingBox(box.x - margin, box.y - margin,
+                                         box.width + 2 * margin, box.height + 2 * margin)
+            if region is not None and self.template_matcher.is_clearly_absent(criteria, screenshot, region=region):
+                return False
+        
+        element = self.find_element(criteria, silent=True, screenshot=screenshot)
+        present = element is not None and element.confidence >= criteria.confidence_threshold
+        
+        self._presence_cache[key] = (digest, present)
+        return present
+    
+    def get_best_score(self, criteria: ElementSearchCriteria) -> float:
+        """Raw best template-match score for the criteria, so it can be compared against several thresholds"""
+        return self.template_matcher.best_score(criteria)
+    
+    def _criteria_key(self, criteria: ElementSearchCriteria) -> tuple:
+        """Everything about the criteria that can change a detection result"""
+        region = criteria.region
+        region_key = (region.x, region.y, region.width, region.height) if region is not None else None
+        return (criteria.name, criteria.template_path, criteria.confidence_threshold, region_key,
+                criteria.grayscale, tuple(criteria.scale_steps or ()), tuple(criteria.detection_methods))
+    
+    def _frame_digest(self, screenshot: np.ndarray) -> bytes:
+        """SHA-256 of a frame's shape and every one of its pixels"""
+        frame, digest = self._last_digest
+        if frame is screenshot:
+            return digest
+        # The whole frame is hashed exactly: the digest keys the presence and
+        # detection caches, and a sample could miss a small change such as a
+        # checkbox tick or a button enabling, returning a stale result. Visual
+        # detection also ignores the criteria region and template matching
+        # widens it when the template does not fit
+        hasher = hashlib.sha256(repr(screenshot.shape).encode())
+        hasher.update(np.ascontiguousarray(screenshot).data)
+        digest = hasher.digest()
+        self._last_digest = (screenshot, digest)
+        return digest
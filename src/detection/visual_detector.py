@@ -8,6 +8,7 @@ from typing import Optional
 from src.core.element import UIElement, ElementSearchCriteria, ElementType, DetectionMethod, BoundingBox, Coordinates
 # from src.utils.screenshot import ScreenshotManager  # Disabled for GitHub
 from src.utils.logger import logger
+from src.utils.screen_capture import grab_screen
 
 class VisualDetector:
     """Visual pattern detection for UI elements"""
@@ -15,13 +16,13 @@ class VisualDetector:
     def __init__(self):
         # self.screenshot_manager = ScreenshotManager()  # Disabled for GitHub
         pass
-    def find_element(self, criteria: ElementSearchCriteria) -> Optional[UIElement]:
+    def find_element(self, criteria: ElementSearchCriteria,
+                     screenshot: Optional[np.ndarray] = None) -> Optional[UIElement]:
         """Find an element using visual pattern detection"""
         try:
-            # Take current screenshot (directly)
-            import pyautogui
-            screenshot = pyautogui.screenshot()
-            screenshot = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            # Take current screenshot unless the caller already captured one
+            if screenshot is None:
+                screenshot = grab_screen()
             if screenshot is None:
                 logger.error("Failed to take screenshot for visual detection")
                 return None
@@ -0,0 +1,119 @@
+"""
+Adaptive poll schedules learned from how long elements take to appear
+
+Instead of checking at a fixed interval, a PollSchedule places its checks at
+quantiles of the element's observed time-to-appear, so checks cluster where the
+element usually shows up and each check covers an equal share of probability.
+Observations are persisted so the schedule improves across runs.
+"""
+import atexit
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.utils.logger import logger
+
+_STATS_PATH = Path.home() / ".w101bots" / "poll_stats.json"
+
+
+class PollSchedule:
+    """Poll timepoints for one element, derived from its recorded appearance times"""
+
+    MIN_SAMPLES = 5  # Below this the caller's fixed interval is used unchanged
+    MAX_SAMPLES = 50  # Only the most recent observations are kept
+    POLL_POINTS = 8  # Number of quantile checkpoints
+    MIN_DELAY = 0.05
+    SAVE_INTERVAL = 30.0  # Minimum seconds between writes of the stats file
+
+    _schedules: Dict[str, "PollSchedule"] = {}
+    _stats: Optional[Dict[str, List[float]]] = None
+    _dirty = False
+    _last_save = None  # time.monotonic() of the last write, None before the first
+    _lock = threading.Lock()
+
+    def __init__(self, name: str, samples: List[float]):
+        self.name = name
+        self.samples = samples
+        self._points = self._compute_points()
+
+    @classmethod
+    def for_element(cls, name: str) -> "PollSchedule":
+        """Get the shared schedule for an element name"""
+        with cls._lock:
+            schedule = cls._schedules.get(name)
+            if schedule is None:
+                stats = cls._load_stats()
+                schedule = cls._schedules[name] = cls(name, stats.setdefault(name, []))
+            return schedule
+
+    def next_delay(self, elapsed: float, check_interval: float) -> float:
+        """Seconds to sleep before the next check, given time already waited"""
+        for point in self._points:
+            if point > elapsed:
+                return max(point - elapsed, self.MIN_DELAY)
+        # Past every observed appearance time: fall back to the fixed interval
+        return check_interval
+
+    def record(self, wait_time: float):
+        """
+        Record how long the element took to appear
+
+        The stats file is written at most once per SAVE_INTERVAL; anything
+        recorded since is written by flush(), which also runs at exit.
+        """
+        cls = type(self)
+        with self._lock:
+            self.samples.append(round(wait_time, 3))
+            del self.samples[:-self.MAX_SAMPLES]
+            self._points = self._compute_points()
+            cls._dirty = True
+            if cls._last_save is None or time.monotonic() - cls._last_save >= self.SAVE_INTERVAL:
+                cls._save_stats()
+
+    @classmethod
+    def flush(cls):
+        """Write any observations not yet saved"""
+        with cls._lock:
+            if cls._dirty:
+                cls._save_stats()
+
+    def _compute_points(self) -> List[float]:
+        """Checkpoints at evenly spaced quantiles of the observed appearance times"""
+        if len(self.samples) < self.MIN_SAMPLES:
+            return []
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        # An extra early check lets the schedule learn if the element gets faster;
+        # otherwise it would only ever be seen (and recorded) at the old quantiles
+        points = [ordered[0] / 2]
+        for i in range(1, self.POLL_POINTS + 1):
+            point = ordered[round(last * i / self.POLL_POINTS)]
+            if not points or point - points[-1] >= self.MIN_DELAY:
+                points.append(point)
+        return points
+
+    @classmethod
+    def _load_stats(cls) -> Dict[str, List[float]]:
+        if cls._stats is None:
+            try:
+                with open(_STATS_PATH, 'r', encoding='utf-8') as file:
+                    cls._stats = json.load(file)
+            except (OSError, ValueError):
+                cls._stats = {}
+        return cls._stats
+
+    @classmethod
+    def _save_stats(cls):
+        cls._dirty = False
+        cls._last_save = time.monotonic()
+        try:
+            _STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(_STATS_PATH, 'w', encoding='utf-8') as file:
+                json.dump(cls._stats, file)
+        except OSError as e:
+            logger.debug(f"Could not save poll stats: {e}")
+
+
+atexit.register(PollSchedule.flush)
@@ -1,8 +1,11 @@
 """
 Process detection utilities
 """
+import ctypes
+import sys
+import time
 import psutil
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 from src.utils.logger import logger
 
 class ProcessUtils:
@@ -115,3 +118,147 @@ class ProcessUtils:
                 seen_pids.add(proc.pid)
         
         return unique_processes
+
+    
+    @staticmethod
+    def get_process_tree_pids(pid: int) -> Set[int]:
+        """
+        Get a process's PID together with the PIDs of all its descendants
+        
+        Args:
+            pid: PID of the root process
+            
+        Returns:
+            Set of PIDs (just the root if it has exited or cannot be inspected)
+        """
+        pids = {pid}
+        try:
+            pids.update(child.pid for child in psutil.Process(pid).children(recursive=True))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+        return pids
+    
+    @staticmethod
+    def _find_window_handle(pids: Set[int], title_substring: str) -> Optional[int]:
+        """Handle of the first visible top-level window owned by pids whose title matches (Windows only)"""
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        needle = title_substring.lower()
+        found = []
+        
+        @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+        def _check_window(hwnd, _):
+            if not user32.IsWindowVisible(hwnd):
+                return True
+            owner_pid = wintypes.DWORD()
+            user32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner_pid))
+            if owner_pid.value not in pids:
+                return True
+            length = user32.GetWindowTextLengthW(hwnd)
+            title = ctypes.create_unicode_buffer(length + 1)
+            user32.GetWindowTextW(hwnd, title, length + 1)
+            if needle in title.value.lower():
+                found.append(hwnd)
+                return False  # Stop enumerating
+            return True
+        
+        user32.EnumWindows(_check_window, 0)
+        return found[0] if found else None
+    
+    @staticmethod
+    def has_visible_window(pids: Set[int], title_substring: str) -> Optional[bool]:
+        """
+        Check if any of the given processes owns a visible top-level window
+        whose title contains title_substring
+        
+        Args:
+            pids: PIDs whose windows count
+            title_substring: Case-insensitive text the window title must contain
+            
+        Returns:
+            True/False, or None when window enumeration is unavailable (non-Windows)
+        """
+        if sys.platform != 'win32':
+            return None
+        
+        return ProcessUtils._find_window_handle(pids, title_substring) is not None
+    
+    @staticmethod
+    def focus_process_window(pids: Set[int], title_substring: str) -> Optional[bool]:
+        """
+        Bring a process's matching window to the foreground, restoring it if minimized
+        
+        Args:
+            pids: PIDs whose windows count
+            title_substring: Case-insensitive text the window title must contain
+            
+        Returns:
+            True if a window was focused, False if there was none or Windows refused
+            the focus change, None when window handling is unavailable (non-Windows)
+        """
+        if sys.platform != 'win32':
+            return None
+        
+        hwnd = ProcessUtils._find_window_handle(pids, title_substring)
+        if hwnd is None:
+            return False
+        
+        user32 = ctypes.windll.user32
+        if user32.IsIconic(hwnd):
+            user32.ShowWindow(hwnd, 9)  # SW_RESTORE
+        return bool(user32.SetForegroundWindow(hwnd))
+    
+    @staticmethod
+    def get_process_window_rect(pid: int, title_substring: str = "Wizard101") -> Optional[Tuple[int, int, int, int]]:
+        """
+        Get the screen rectangle of a process's (or its children's) matching window
+        
+        Args:
+            pid: PID of the launched process
+            title_substring: Case-insensitive text the window title must contain
+            
+        Returns:
+            (x, y, width, height), or None if there is no such window or
+            window enumeration is unavailable (non-Windows)
+        """
+        if sys.platform != 'win32':
+            return None
+        
+        hwnd = ProcessUtils._find_window_handle(ProcessUtils.get_process_tree_pids(pid), title_substring)
+        if hwnd is None:
+            return None
+        
+        from ctypes import wintypes
+        rect = wintypes.RECT()
+        if not ctypes.windll.user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            return None
+        return rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top
+    
+    @staticmethod
+    def wait_for_process_window(pid: int, title_substring: str = "Wizard101",
+                                timeout: float = 30.0, poll_interval: float = 0.1) -> Optional[bool]:
+        """
+        Wait until a process (or one it spawned) shows a window with a matching title
+        
+        Enumerating windows is far cheaper than a screenshot and template match,
+        so this is a cheap barrier before any screen-based detection.
+        
+        Args:
+            pid: PID of the launched process
+            title_substring: Case-insensitive text the window title must contain
+            timeout: Maximum time to wait in seconds
+            poll_interval: Time between window checks in seconds
+            
+        Returns:
+            True if the window appeared, False on timeout, None when window
+            enumeration is unavailable (non-Windows)
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            # Re-read the tree each pass: launchers often hand off to a child process
+            found = ProcessUtils.has_visible_window(ProcessUtils.get_process_tree_pids(pid), title_substring)
+            if found is None or found:
+                return found
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_interval)
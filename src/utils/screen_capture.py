@@ -0,0 +1,67 @@
+"""
+Fast screen capture utilities
+
+Grabs the primary monitor with a persistent mss instance and reads its BGRA
+buffer straight into a numpy array, avoiding pyautogui's per-call PIL image.
+Falls back to pyautogui when mss is not installed.
+"""
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from src.core.element import BoundingBox
+from src.utils.logger import logger
+
+try:
+    import mss
+except ImportError:  # pragma: no cover - optional fast capture backend
+    mss = None
+
+# mss keeps per-thread device contexts on Windows, so each thread gets its own grabber
+_local = threading.local()
+
+# Set once the pyautogui fallback has been reported, so it is logged only once
+_fallback_logged = False
+
+
+def grab_screen(region: Optional[BoundingBox] = None) -> Optional[np.ndarray]:
+    """
+    Take a screenshot of the primary monitor as a BGR OpenCV image
+
+    With a region, only that rectangle (clamped to the screen) is captured,
+    which is much cheaper than a full-screen grab for small areas.
+    """
+    if mss is not None:
+        sct = getattr(_local, "sct", None)
+        if sct is None:
+            sct = _local.sct = mss.mss()
+        # Monitor 1 is the primary screen, the same area pyautogui grabs
+        monitor = sct.monitors[1]
+        if region is not None:
+            left = max(region.x, 0)
+            top = max(region.y, 0)
+            right = min(region.x + region.width, monitor["width"])
+            bottom = min(region.y + region.height, monitor["height"])
+            if right <= left or bottom <= top:
+                return None
+            monitor = {"left": monitor["left"] + left, "top": monitor["top"] + top,
+                       "width": right - left, "height": bottom - top}
+        raw = sct.grab(monitor)
+        bgra = np.frombuffer(raw.raw, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+
+    global _fallback_logged
+    if not _fallback_logged:
+        _fallback_logged = True
+        logger.info("mss is not installed; capturing the screen with pyautogui (slower)")
+    
+    import pyautogui
+    screenshot = pyautogui.screenshot()
+    frame = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+    if region is not None:
+        frame = frame[max(region.y, 0):region.y + region.height, max(region.x, 0):region.x + region.width]
+        if frame.size == 0:
+            return None
+    return frame
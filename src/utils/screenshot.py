@@ -2,7 +2,7 @@
 Screenshot utilities
 """
 import time
-import pyautogui
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from typing import Optional
@@ -10,10 +10,19 @@ from pathlib import Path
 
 from config import config
 from src.utils.logger import logger
+from src.utils.screen_capture import grab_screen
 
 class ScreenshotManager:
     """Manages screenshot capture and processing"""
     
+    # PNG zlib level for saved screenshots, pinned to the fastest setting rather
+    # than left to whatever the OpenCV build defaults to
+    PNG_COMPRESSION = 1
+    
+    # One writer thread shared by all managers, so encoding and disk I/O never
+    # block automation and saves land in the order they were made
+    _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot-writer")
+    
     def __init__(self):
         self.screenshot_dir = config.SCREENSHOT_DIR
         self.screenshot_dir.mkdir(exist_ok=True)
@@ -21,14 +30,18 @@ class ScreenshotManager:
     def take_screenshot(self) -> Optional[np.ndarray]:
         """Take a screenshot and return as OpenCV image"""
         try:
-            screenshot = pyautogui.screenshot()
-            return cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            return grab_screen()
         except Exception as e:
             logger.error(f"Failed to take screenshot: {e}")
             return None
     
     def save_screenshot(self, image: np.ndarray, name: str) -> Optional[Path]:
-        """Save a screenshot to disk"""
+        """
+        Save a screenshot to disk in the background
+        
+        Returns the path the file is being written to; the image must not be
+        modified afterwards.
+        """
         try:
             if not config.SAVE_SCREENSHOTS:
                 return None
@@ -37,14 +50,31 @@ class ScreenshotManager:
             filename = f"{name}_{timestamp}.png"
             filepath = self.screenshot_dir / filename
             
-            cv2.imwrite(str(filepath), image)
-            logger.debug(f"Screenshot saved: {filepath}")
+            self._writer.submit(self._write_screenshot, image, filepath)
             return filepath
             
         except Exception as e:
             logger.error(f"Failed to save screenshot '{name}': {e}")
             return None
     
+    def _write_screenshot(self, image: np.ndarray, filepath: Path):
+        """Encode and write one screenshot; runs on the writer thread"""
+        try:
+            if not cv2.imwrite(str(filepath), image, [cv2.IMWRITE_PNG_COMPRESSION, self.PNG_COMPRESSION]):
+                raise OSError("cv2.imwrite returned False")
+            logger.debug(f"Screenshot saved: {filepath}")
+        except Exception as e:
+            logger.error(f"Failed to save screenshot '{filepath.name}': {e}")
+    
+    def capture_and_save(self, name: str) -> Optional[Path]:
+        """Take and save a screenshot, skipping the capture entirely when saving is disabled"""
+        if not config.SAVE_SCREENSHOTS:
+            return None
+        screenshot = self.take_screenshot()
+        if screenshot is not None:
+            return self.save_screenshot(screenshot, name)
+        return None
+    
     def save_debug_screenshot(self, name: str) -> Optional[Path]:
         """Take and save a debug screenshot"""
         screenshot = self.take_screenshot()
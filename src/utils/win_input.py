@@ -0,0 +1,218 @@
+"""
+Low-level keyboard and mouse input utilities
+
+Sends input straight through the Win32 input queue via ctypes SendInput,
+avoiding pyautogui's per-call PAUSE sleep and failsafe checks. Falls back to
+pyautogui on non-Windows platforms.
+"""
+import ctypes
+import sys
+from ctypes import wintypes
+from typing import Optional, Tuple
+
+# SendInput constants
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+
+# GetSystemMetrics indices
+SM_CXSCREEN = 0
+SM_CYSCREEN = 1
+
+# Virtual-key codes
+VK_B = 0x42
+VK_H = 0x48
+
+# pyautogui-style key names -> virtual-key codes for the keys bots send
+_NAMED_KEYS = {
+    "space": 0x20, "enter": 0x0D, "return": 0x0D, "tab": 0x09, "esc": 0x1B, "escape": 0x1B,
+    "backspace": 0x08, "delete": 0x2E, "del": 0x2E, "shift": 0x10, "ctrl": 0x11, "alt": 0x12,
+    "left": 0x25, "up": 0x26, "right": 0x27, "down": 0x28,
+    **{f"f{n}": 0x6F + n for n in range(1, 13)},
+    **{chr(c).lower(): c for c in range(ord("A"), ord("Z") + 1)},
+    **{chr(c): c for c in range(ord("0"), ord("9") + 1)},
+}
+
+_user32 = ctypes.WinDLL('user32', use_last_error=True) if sys.platform == 'win32' else None
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
+    ]
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD), ("union", _INPUTUNION)]
+
+
+def _key_input(vk_code: int, flags: int, scan_code: int = 0) -> _INPUT:
+    """Build a keyboard INPUT record"""
+    return _INPUT(type=INPUT_KEYBOARD,
+                  union=_INPUTUNION(ki=_KEYBDINPUT(wVk=vk_code, wScan=scan_code, dwFlags=flags)))
+
+
+def _mouse_input(flags: int) -> _INPUT:
+    """Build a mouse INPUT record acting at the current cursor position"""
+    return _INPUT(type=INPUT_MOUSE, union=_INPUTUNION(mi=_MOUSEINPUT(dwFlags=flags)))
+
+
+def vk_code(key_name: str) -> Optional[int]:
+    """Virtual-key code for a pyautogui-style key name, or None if it is not mapped"""
+    return _NAMED_KEYS.get(key_name.lower())
+
+
+def key_down(key_name: str) -> None:
+    """Press (without releasing) a key given by its pyautogui-style name"""
+    _send_key(key_name, 0)
+
+
+def key_up(key_name: str) -> None:
+    """Release a key given by its pyautogui-style name"""
+    _send_key(key_name, KEYEVENTF_KEYUP)
+
+
+def _send_key(key_name: str, flags: int) -> None:
+    code = vk_code(key_name)
+    if _user32 is None or code is None:
+        import pyautogui
+        if flags & KEYEVENTF_KEYUP:
+            pyautogui.keyUp(key_name, _pause=False)
+        else:
+            pyautogui.keyDown(key_name, _pause=False)
+        return
+
+    inputs = (_INPUT * 1)(_key_input(code, flags))
+    if _user32.SendInput(1, inputs, ctypes.sizeof(_INPUT)) != 1:
+        raise OSError(ctypes.get_last_error(), f"SendInput failed for key '{key_name}'")
+
+
+def press_key(vk_code: int) -> None:
+    """Press and release a key identified by its virtual-key code"""
+    if _user32 is None:
+        import pyautogui
+        pyautogui.press(chr(vk_code).lower())
+        return
+
+    # Key down and key up go in one SendInput call so nothing can interleave
+    inputs = (_INPUT * 2)(_key_input(vk_code, 0), _key_input(vk_code, KEYEVENTF_KEYUP))
+    sent = _user32.SendInput(2, inputs, ctypes.sizeof(_INPUT))
+    if sent != 2:
+        raise OSError(ctypes.get_last_error(), f"SendInput delivered {sent}/2 events for key 0x{vk_code:02X}")
+
+
+def type_text(text: str) -> None:
+    """Type text as Unicode keystrokes, all delivered by a single SendInput call"""
+    if _user32 is None:
+        import pyautogui
+        pyautogui.typewrite(text, interval=0.05)
+        return
+
+    # KEYEVENTF_UNICODE takes UTF-16 code units, so characters outside the BMP
+    # are sent as their surrogate pair
+    units = memoryview(text.encode('utf-16-le')).cast('H')
+    inputs = (_INPUT * (2 * len(units)))()
+    for i, unit in enumerate(units):
+        inputs[2 * i] = _key_input(0, KEYEVENTF_UNICODE, unit)
+        inputs[2 * i + 1] = _key_input(0, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP, unit)
+    sent = _user32.SendInput(len(inputs), inputs, ctypes.sizeof(_INPUT))
+    if sent != len(inputs):
+        raise OSError(ctypes.get_last_error(), f"SendInput delivered {sent}/{len(inputs)} events while typing")
+
+
+def get_cursor_position() -> Tuple[int, int]:
+    """Current cursor position in screen coordinates"""
+    if _user32 is None:
+        import pyautogui
+        x, y = pyautogui.position()
+        return int(x), int(y)
+
+    point = wintypes.POINT()
+    if not _user32.GetCursorPos(ctypes.byref(point)):
+        raise ctypes.WinError(ctypes.get_last_error())
+    return point.x, point.y
+
+
+def screen_size() -> Tuple[int, int]:
+    """Width and height of the primary screen in pixels"""
+    if _user32 is None:
+        import pyautogui
+        width, height = pyautogui.size()
+        return int(width), int(height)
+
+    return _user32.GetSystemMetrics(SM_CXSCREEN), _user32.GetSystemMetrics(SM_CYSCREEN)
+
+
+def move_cursor(x: int, y: int) -> None:
+    """Move the cursor to screen coordinates"""
+    if _user32 is None:
+        import pyautogui
+        pyautogui.moveTo(x, y)
+        return
+
+    if not _user32.SetCursorPos(int(x), int(y)):
+        raise ctypes.WinError(ctypes.get_last_error())
+
+
+def hotkey(*key_names: str) -> None:
+    """
+    Press keys in order and release them in reverse, like pyautogui.hotkey
+
+    Every down and up event goes in one SendInput call, so a shortcut such as
+    ctrl+l cannot be split by other input. A single name presses one key.
+    """
+    codes = [vk_code(name) for name in key_names]
+    if _user32 is None or None in codes:
+        import pyautogui
+        pyautogui.hotkey(*key_names, _pause=False)
+        return
+
+    events = [_key_input(code, 0) for code in codes]
+    events += [_key_input(code, KEYEVENTF_KEYUP) for code in reversed(codes)]
+    inputs = (_INPUT * len(events))(*events)
+    sent = _user32.SendInput(len(events), inputs, ctypes.sizeof(_INPUT))
+    if sent != len(events):
+        raise OSError(ctypes.get_last_error(), f"SendInput delivered {sent}/{len(events)} events for {'+'.join(key_names)}")
+
+
+def click(x: int, y: int, clicks: int = 1) -> None:
+    """
+    Move the cursor to screen coordinates and left-click there
+
+    clicks > 1 sends a double or triple click; the presses arrive back to back,
+    well inside the system double-click time.
+    """
+    if _user32 is None:
+        import pyautogui
+        pyautogui.click(x, y, clicks=clicks)
+        return
+
+    move_cursor(x, y)
+    # Every button down and up goes in one SendInput call so nothing can interleave
+    events = [_mouse_input(flags) for _ in range(clicks) for flags in (MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP)]
+    inputs = (_INPUT * len(events))(*events)
+    sent = _user32.SendInput(len(events), inputs, ctypes.sizeof(_INPUT))
+    if sent != len(events):
+        raise OSError(ctypes.get_last_error(), f"SendInput delivered {sent}/{len(events)} events for click at ({x}, {y})")
@@ -0,0 +1,89 @@
+"""
+Cached YAML config loading
+
+Config files are keyed on a hash of their content rather than mtime, so touched,
+copied or mtime-preserving restores of a file are still recognised. Parsed data
+is kept in memory for the life of the process and in a JSON sidecar next to the
+file (.<name>.cache) so later runs skip the YAML parser entirely.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Union
+
+from src.utils.logger import logger
+
+# (absolute path, content digest) -> parsed data. The parsed data is shared by
+# every caller loading that file, so it is read-only
+_YAML_CACHE: "OrderedDict[tuple, Any]" = OrderedDict()
+_YAML_CACHE_MAX = 32
+
+
+def content_digest(data: bytes) -> str:
+    """Short content hash of a config file's bytes"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def load_yaml(path: Union[str, Path]) -> Any:
+    """
+    Parse a YAML file, reusing earlier parses of the same content
+
+    Raises FileNotFoundError if the file does not exist. The returned data may
+    be shared with other callers and must not be modified in place.
+    """
+    path = Path(path)
+    # A single read both checks existence and feeds the content hash
+    data = path.read_bytes()
+
+    # absolute() needs no filesystem access, unlike resolve()
+    key = (str(path.absolute()), content_digest(data))
+    if key in _YAML_CACHE:
+        _YAML_CACHE.move_to_end(key)
+        logger.debug("Loaded %s from memory cache", path)
+        return _YAML_CACHE[key]
+
+    parsed = _load_yaml_with_sidecar(path, data, key[1])
+    _YAML_CACHE[key] = parsed
+    if len(_YAML_CACHE) > _YAML_CACHE_MAX:
+        _YAML_CACHE.popitem(last=False)
+    return parsed
+
+
+def _load_yaml_with_sidecar(path: Path, data: bytes, digest: str) -> Any:
+    """
+    Parse a YAML file's bytes, going through a JSON sidecar cache next to it
+
+    The sidecar (.<name>.cache) records the digest of the content it was built
+    from and is used only while that still matches; otherwise the YAML is parsed
+    and the sidecar rewritten. Data that would not survive a JSON round trip is
+    never cached.
+    """
+    sidecar = path.with_name(f".{path.name}.cache")
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as file:
+            cached = json.load(file)
+        if cached["digest"] == digest:
+            return cached["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # Missing, stale or corrupt sidecar: parse the YAML
+
+    # Imported here so a fresh sidecar never pulls in PyYAML. libyaml's C parser
+    # is much faster than the pure-Python one when available
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    # Bytes go straight to libyaml, which does its own UTF-8 decoding
+    parsed = yaml.load(data, Loader=loader)
+
+    try:
+        dumped = json.dumps({"digest": digest, "data": parsed})
+        if json.loads(dumped)["data"] == parsed:
+            tmp = sidecar.with_name(sidecar.name + ".tmp")
+            tmp.write_text(dumped, encoding='utf-8')
+            os.replace(tmp, sidecar)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug("Could not write YAML cache %s: %s", sidecar, e)
+
+    return parsed
@@ -0,0 +1,152 @@
+"""
+Unit tests for movement pattern compilation and execution
+"""
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add the project root to the path so we can import our modules
+project_root = os.path.join(os.path.dirname(__file__), '..', '..', '..')
+sys.path.insert(0, project_root)
+
+from src.automation.movement_automation import MovementAutomation
+
+
+class TestCompilePatterns(unittest.TestCase):
+    """Test cases for validating patterns into (key, duration) steps"""
+    
+    def test_valid_pattern(self):
+        compiled = MovementAutomation._compile_patterns({
+            "walk": [{"key": "w", "duration": 1.5}, {"key": "a", "duration": "0.25"}],
+            "not_a_pattern": {"x": 1},
+            "name": "garden",
+        })
+        self.assertEqual(compiled, {"walk": ((("w", 1.5), ("a", 0.25)), None, False)})
+    
+    def test_invalid_command_ends_steps(self):
+        bad = {"key": "d"}
+        compiled = MovementAutomation._compile_patterns({
+            "walk": [{"key": "w", "duration": 1.0}, bad, {"key": "s", "duration": 1.0}],
+        })
+        self.assertEqual(compiled["walk"], ((("w", 1.0),), bad, False))
+    
+    def test_bad_durations_are_invalid_not_raised(self):
+        for duration in ("soon", None, [1], -1.0, float("nan"), float("inf")):
+            with self.subTest(duration=duration):
+                bad = {"key": "w", "duration": duration}
+                compiled = MovementAutomation._compile_patterns({"walk": [bad]})
+                self.assertEqual(compiled["walk"], ((), bad, False))
+    
+    def test_fuse_adjacent_commands(self):
+        pattern = [
+            {"key": "w", "duration": 1.0},
+            {"key": "w", "duration": 0.5},
+            {"key": "a", "duration": 0.2},
+            {"key": "w", "duration": 0.3},
+        ]
+        fused = MovementAutomation._compile_patterns({"fuse_adjacent_commands": True, "walk": pattern})
+        self.assertEqual(fused["walk"][0], (("w", 1.5), ("a", 0.2), ("w", 0.3)))
+        
+        unfused = MovementAutomation._compile_patterns({"walk": pattern})
+        self.assertEqual(len(unfused["walk"][0]), 4)
+    
+    def test_mode_mapping(self):
+        compiled = MovementAutomation._compile_patterns({
+            "both": {"mode": "parallel", "steps": [{"key": "w", "duration": 1.0}]},
+            "one": {"mode": "sequential", "steps": [{"key": "w", "duration": 1.0}]},
+        })
+        self.assertTrue(compiled["both"][2])
+        self.assertFalse(compiled["one"][2])
+    
+    def test_non_dict_config(self):
+        self.assertEqual(MovementAutomation._compile_patterns(None), {})
+
+
+class TestExecutePattern(unittest.TestCase):
+    """Test cases for sequential and parallel pattern execution"""
+    
+    def _automation(self, garden_config):
+        automation = MovementAutomation(Mock(), config=garden_config)
+        automation.INTER_COMMAND_DELAY = 0.0
+        self.presses = []
+        self.lock = threading.Lock()
+        
+        def press(key, duration):
+            with self.lock:
+                self.presses.append(("down", key, time.perf_counter()))
+            time.sleep(duration)
+            with self.lock:
+                self.presses.append(("up", key, time.perf_counter()))
+        
+        automation._press_key_fast = press
+        return automation
+    
+    def test_sequential_order(self):
+        automation = self._automation({"walk": [
+            {"key": "w", "duration": 0.01}, {"key": "a", "duration": 0.01},
+        ]})
+        result = automation.execute_pattern("walk")
+        self.assertTrue(result.success)
+        self.assertEqual([(event, key) for event, key, _ in self.presses],
+                         [("down", "w"), ("up", "w"), ("down", "a"), ("up", "a")])
+    
+    def test_bad_duration_fails_pattern(self):
+        automation = self._automation({"walk": [
+            {"key": "w", "duration": 0.01}, {"key": "a", "duration": "long"},
+        ]})
+        result = automation.execute_pattern("walk")
+        self.assertFalse(result.success)
+        # Commands before the bad one still ran, as for any invalid command
+        self.assertEqual([key for event, key, _ in self.presses if event == "down"], ["w"])
+    
+    def test_parallel_lanes_overlap_across_keys(self):
+        automation = self._automation({"diagonal": {"mode": "parallel", "steps": [
+            {"key": "w", "duration": 0.2}, {"key": "d", "duration": 0.2},
+        ]}})
+        result = automation.execute_pattern("diagonal")
+        self.assertTrue(result.success)
+        
+        times = {(event, key): t for event, key, t in self.presses}
+        # Each key went down before the other was released
+        self.assertLess(times[("down", "w")], times[("up", "d")])
+        self.assertLess(times[("down", "d")], times[("up", "w")])
+    
+    def test_parallel_same_key_runs_in_order(self):
+        automation = self._automation({"hold": {"mode": "parallel", "steps": [
+            {"key": "w", "duration": 0.02}, {"key": "a", "duration": 0.01}, {"key": "w", "duration": 0.02},
+        ]}})
+        self.assertTrue(automation.execute_pattern("hold").success)
+        
+        w_events = [event for event, key, _ in self.presses if key == "w"]
+        self.assertEqual(w_events, ["down", "up", "down", "up"])
+    
+    def test_parallel_invalid_presses_nothing(self):
+        automation = self._automation({"hold": {"mode": "parallel", "steps": [
+            {"key": "w", "duration": 0.01}, {"key": "a", "duration": -1},
+        ]}})
+        self.assertFalse(automation.execute_pattern("hold").success)
+        self.assertEqual(self.presses, [])
+
+
+
+class TestPressKeyFast(unittest.TestCase):
+    """Test cases for the timed key hold"""
+    
+    @patch('src.utils.win_input.key_up')
+    @patch('src.utils.win_input.key_down')
+    def test_hold_goes_through_win_input(self, mock_down, mock_up):
+        automation = MovementAutomation(Mock(), config={"walk": []})
+        start = time.perf_counter()
+        automation._press_key_fast("w", 0.05)
+        elapsed = time.perf_counter() - start
+        
+        mock_down.assert_called_once_with("w")
+        mock_up.assert_called_once_with("w")
+        self.assertGreaterEqual(elapsed, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Unit tests for the template matcher's correlation paths
+"""
+import unittest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add the project root to the path so we can import our modules
+project_root = os.path.join(os.path.dirname(__file__), '..', '..', '..')
+sys.path.insert(0, project_root)
+
+from src.core.element import ElementSearchCriteria, ElementType, BoundingBox
+from src.detection.template_matcher import TemplateMatcher
+
+TEMPLATE_DIR = os.path.join(project_root, 'assets', 'templates', 'trivia')
+TEMPLATE_NAMES = ['google_search_icon.png', 'login_button.png', 'submit_answer_button.png']
+
+
+class TestCcoeffNormedParity(unittest.TestCase):
+    """_ccoeff_normed must agree with cv2.TM_CCOEFF_NORMED"""
+    
+    def setUp(self):
+        self.matcher = TemplateMatcher()
+        rng = np.random.default_rng(0)
+        noise = rng.integers(0, 256, (360, 480, 3), dtype=np.uint8)
+        self.frames = {
+            'noise': noise,
+            'blurred': cv2.GaussianBlur(noise, (9, 9), 0),
+            'flat': np.full((360, 480, 3), 128, dtype=np.uint8),
+            # A couple of grey levels of variation only
+            'low_variance': (120 + rng.integers(0, 2, (360, 480, 3))).astype(np.uint8),
+        }
+    
+    def _templates(self):
+        for name in TEMPLATE_NAMES:
+            loaded = self.matcher._load_template(os.path.join(TEMPLATE_DIR, name))
+            self.assertIsNotNone(loaded, name)
+            yield name, loaded
+    
+    def _assert_parity(self, frame, template, template_norm, label):
+        native = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+        custom = self.matcher._ccoeff_normed(frame, template_norm)
+        self.assertEqual(native.shape, custom.shape, label)
+        # Native can return non-finite values on zero-variance windows
+        finite = np.isfinite(native)
+        np.testing.assert_allclose(custom[finite], native[finite], atol=1e-3, err_msg=label)
+    
+    def test_parity_across_templates_and_frames(self):
+        for name, (template, template_norm) in self._templates():
+            h, w = template.shape[:2]
+            for frame_name, frame in self.frames.items():
+                if frame.shape[0] < h or frame.shape[1] < w:
+                    continue
+                with self.subTest(template=name, frame=frame_name):
+                    self._assert_parity(frame, template, template_norm, f"{name} on {frame_name}")
+    
+    def test_parity_with_embedded_template(self):
+        for name, (template, template_norm) in self._templates():
+            frame = self.frames['blurred'].copy()
+            h, w = template.shape[:2]
+            if frame.shape[0] < h + 40 or frame.shape[1] < w + 60:
+                continue
+            frame[40:40 + h, 60:60 + w] = template
+            with self.subTest(template=name):
+                self._assert_parity(frame, template, template_norm, name)
+                _, score, _, loc = cv2.minMaxLoc(self.matcher._ccoeff_normed(frame, template_norm))
+                self.assertEqual(loc, (60, 40))
+                self.assertGreater(score, 0.99)
+    
+    def test_flat_frame_scores_zero(self):
+        for name, (_, template_norm) in self._templates():
+            with self.subTest(template=name):
+                custom = self.matcher._ccoeff_normed(self.frames['flat'], template_norm)
+                self.assertTrue(np.all(np.isfinite(custom)))
+                self.assertLess(float(np.abs(custom).max()), 1e-3)
+    
+    def test_frame_stats_reused_for_same_frame(self):
+        frame = self.frames['blurred']
+        stats = self.matcher._frame_stats(frame)
+        self.assertIs(self.matcher._frame_stats(frame), stats)
+        self.assertIsNot(self.matcher._frame_stats(frame.copy()), stats)
+
+
+
+class TestIsClearlyAbsent(unittest.TestCase):
+    """The histogram pre-check must only reject regions that cannot hold the template"""
+    
+    def setUp(self):
+        self.matcher = TemplateMatcher()
+        self.template_path = os.path.join(TEMPLATE_DIR, 'login_button.png')
+        self.template = cv2.imread(self.template_path)
+        h, w = self.template.shape[:2]
+        self.frame = np.zeros((h + 100, w + 100, 3), dtype=np.uint8)
+        self.frame[50:50 + h, 50:50 + w] = self.template
+        self.box = BoundingBox(50, 50, w, h)
+        self.criteria = ElementSearchCriteria(name="login_button", element_type=ElementType.BUTTON,
+                                              template_path=self.template_path)
+    
+    def test_without_region_never_absent(self):
+        self.assertFalse(self.matcher.is_clearly_absent(self.criteria, self.frame))
+    
+    def test_region_with_template_is_not_absent(self):
+        self.assertFalse(self.matcher.is_clearly_absent(self.criteria, self.frame, region=self.box))
+    
+    def test_region_without_template_is_absent(self):
+        blank = np.zeros_like(self.frame)
+        self.assertTrue(self.matcher.is_clearly_absent(self.criteria, blank, region=self.box))
+    
+    def test_region_is_clamped_to_frame(self):
+        h, w = self.frame.shape[:2]
+        # Starts off the top-left corner and runs past the bottom-right one
+        overhanging = BoundingBox(-20, -20, w + 40, h + 40)
+        blank = np.zeros_like(self.frame)
+        self.assertTrue(self.matcher.is_clearly_absent(self.criteria, blank, region=overhanging))
+        # Entirely outside the frame: no opinion rather than an empty or wrapped slice
+        outside = BoundingBox(w + 10, h + 10, 50, 50)
+        self.assertFalse(self.matcher.is_clearly_absent(self.criteria, blank, region=outside))
+        negative = BoundingBox(-80, -80, 40, 40)
+        self.assertFalse(self.matcher.is_clearly_absent(self.criteria, blank, region=negative))
+
+
+if __name__ == '__main__':
+    unittest.main()
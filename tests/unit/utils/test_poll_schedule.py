@@ -0,0 +1,117 @@
+"""
+Unit tests for adaptive poll schedules
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import sys
+import os
+
+# Add the project root to the path so we can import our modules
+project_root = os.path.join(os.path.dirname(__file__), '..', '..', '..')
+sys.path.insert(0, project_root)
+
+from src.utils import poll_schedule
+from src.utils.poll_schedule import PollSchedule
+
+
+class TestPollSchedule(unittest.TestCase):
+    """Test cases for quantile checkpoints and stats persistence"""
+    
+    def setUp(self):
+        """Point the stats file at a temporary directory and reset shared state"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stats_path = Path(self.tmpdir.name) / "poll_stats.json"
+        path_patch = patch.object(poll_schedule, "_STATS_PATH", self.stats_path)
+        path_patch.start()
+        self.addCleanup(path_patch.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+        self._reset_class_state()
+        self.addCleanup(self._reset_class_state)
+    
+    def _reset_class_state(self):
+        PollSchedule._schedules = {}
+        PollSchedule._stats = None
+        PollSchedule._dirty = False
+        PollSchedule._last_save = None
+    
+    def test_below_min_samples_uses_fixed_interval(self):
+        schedule = PollSchedule("element", [1.0] * (PollSchedule.MIN_SAMPLES - 1))
+        self.assertEqual(schedule._points, [])
+        self.assertEqual(schedule.next_delay(0.0, 0.7), 0.7)
+        self.assertEqual(schedule.next_delay(5.0, 0.7), 0.7)
+    
+    def test_points_follow_sample_quantiles(self):
+        samples = [float(i) for i in range(1, 11)]  # 1.0 .. 10.0
+        schedule = PollSchedule("element", samples)
+        points = schedule._points
+        
+        # Early check at half the fastest observation, then evenly spaced quantiles
+        self.assertEqual(points[0], 0.5)
+        self.assertEqual(points[-1], 10.0)
+        self.assertEqual(points, sorted(points))
+        self.assertTrue(all(point in samples for point in points[1:]))
+        self.assertLessEqual(len(points), PollSchedule.POLL_POINTS + 1)
+    
+    def test_next_delay_waits_for_next_point(self):
+        schedule = PollSchedule("element", [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertAlmostEqual(schedule.next_delay(0.0, 1.0), 0.5)
+        self.assertAlmostEqual(schedule.next_delay(1.5, 1.0), schedule._points[2] - 1.5)
+        # Never shorter than MIN_DELAY
+        self.assertGreaterEqual(schedule.next_delay(0.49, 1.0), PollSchedule.MIN_DELAY)
+        # Past every point: back to the fixed interval
+        self.assertEqual(schedule.next_delay(10.0, 0.8), 0.8)
+    
+    def test_close_points_are_merged(self):
+        schedule = PollSchedule("element", [1.0, 1.01, 1.02, 1.03, 1.04, 1.05])
+        gaps = [b - a for a, b in zip(schedule._points, schedule._points[1:])]
+        self.assertTrue(all(gap >= PollSchedule.MIN_DELAY for gap in gaps))
+    
+    def test_record_keeps_most_recent_samples(self):
+        schedule = PollSchedule.for_element("element")
+        for i in range(PollSchedule.MAX_SAMPLES + 10):
+            schedule.record(float(i))
+        self.assertEqual(len(schedule.samples), PollSchedule.MAX_SAMPLES)
+        self.assertEqual(schedule.samples[0], 10.0)
+    
+    def test_persistence_round_trip(self):
+        schedule = PollSchedule.for_element("element")
+        for wait_time in (0.1234, 0.5, 0.75, 1.0, 2.0):
+            schedule.record(wait_time)
+        PollSchedule.flush()
+        
+        with open(self.stats_path, 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file), {"element": [0.123, 0.5, 0.75, 1.0, 2.0]})
+        
+        # A fresh process state loads the same samples and schedule back
+        points = schedule._points
+        self._reset_class_state()
+        reloaded = PollSchedule.for_element("element")
+        self.assertEqual(reloaded.samples, [0.123, 0.5, 0.75, 1.0, 2.0])
+        self.assertEqual(reloaded._points, points)
+    
+    def test_record_debounces_writes(self):
+        schedule = PollSchedule.for_element("element")
+        with patch.object(PollSchedule, "_save_stats", wraps=PollSchedule._save_stats) as save:
+            for _ in range(5):
+                schedule.record(1.0)
+            self.assertEqual(save.call_count, 1)
+            self.assertTrue(PollSchedule._dirty)
+            
+            PollSchedule.flush()
+            self.assertEqual(save.call_count, 2)
+            PollSchedule.flush()
+            self.assertEqual(save.call_count, 2)
+        
+        with open(self.stats_path, 'r', encoding='utf-8') as file:
+            self.assertEqual(len(json.load(file)["element"]), 5)
+    
+    def test_corrupt_stats_file_starts_empty(self):
+        self.stats_path.write_text("not json", encoding='utf-8')
+        self.assertEqual(PollSchedule.for_element("element").samples, [])
+
+
+if __name__ == '__main__':
+    unittest.main()